@@ -5,24 +5,51 @@ Simple test for fetch_article function debugging.
 
 import sys
 import json
+from functools import lru_cache
 from pathlib import Path
 
+import orjson
+
 # Add src to path
 sys.path.insert(0, str(Path(__file__).parent / "src"))
 
+# Heavy modules are imported on first use so the CLI starts quickly
+@lru_cache(maxsize=1)
+def _requests():
+    import requests
+    return requests
+
+@lru_cache(maxsize=1)
+def _trafilatura():
+    import trafilatura
+    return trafilatura
+
+@lru_cache(maxsize=1)
+def _readability():
+    import readability
+    return readability
+
+@lru_cache(maxsize=1)
+def _lxml_html():
+    import lxml.html
+    return lxml.html
+
+@lru_cache(maxsize=1)
+def _session():
+    """Shared HTTP session so repeated fetches reuse connections."""
+    return _requests().Session()
+
 def test_simple_fetch(url: str):
     """Test simple HTTP fetch without processing."""
     print(f"\nTesting simple fetch for: {url}")
     
     try:
-        import requests
-        
         headers = {
             'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36'
         }
         
         print("Making HTTP request...")
-        response = requests.get(url, timeout=15, headers=headers)
+        response = _session().get(url, timeout=15, headers=headers)
         print(f"✅ HTTP {response.status_code} - Content length: {len(response.text)} chars")
         
         return response.text
@@ -36,9 +63,7 @@ def test_trafilatura(html_content: str, url: str):
     print("\nTesting trafilatura extraction...")
     
     try:
-        import trafilatura
-        
-        extracted = trafilatura.extract(
+        extracted = _trafilatura().extract(
             html_content,
             output_format='json',
             include_comments=False,
@@ -83,16 +108,15 @@ def test_readability_fallback(html_content: str):
     print("\nTesting readability fallback...")
     
     try:
-        from readability import Document
-        from bs4 import BeautifulSoup
-        
-        doc = Document(html_content)
+        doc = _readability().Document(html_content)
         title = doc.title()
         content_html = doc.summary()
         
-        # Parse content
-        soup = BeautifulSoup(content_html, 'html.parser')
-        text_content = soup.get_text(separator='\n', strip=True)
+        # Flatten content text directly from the lxml tree
+        text_content = ""
+        if content_html.strip():
+            tree = _lxml_html().fromstring(content_html)
+            text_content = '\n'.join(s for s in (t.strip() for t in tree.itertext()) if s)
         
         print(f"✅ Readability extraction successful")
         print(f"   Title: {title}")
@@ -149,7 +173,7 @@ def main():
         result = fetch_article(test_url)
         
         print("RESULT:")
-        print(json.dumps(result, indent=2, ensure_ascii=False))
+        print(orjson.dumps(result, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS).decode())
         
     except Exception as e:
         print(f"❌ Full function error: {e}")
@@ -4,7 +4,10 @@ Development utilities for News Fetcher MCP Server
 """
 
 import json
+import os
 import sys
+from datetime import datetime
+from functools import lru_cache
 from pathlib import Path
 
 # Add src to path
@@ -13,16 +16,22 @@ sys.path.insert(0, str(Path(__file__).parent / "src"))
 from news_fetcher.config import Config
 
 
+@lru_cache(maxsize=1)
+def get_config() -> Config:
+    """Get the shared configuration, loading it on first use."""
+    return Config()
+
+
 def add_source(category: str, url: str):
     """Add a new RSS source."""
-    config = Config()
+    config = get_config()
     config.add_source(category, url)
     print(f"Added {url} to {category} category")
 
 
 def list_sources():
     """List all configured sources."""
-    config = Config()
+    config = get_config()
     print("Configured RSS Sources:")
     print("=" * 30)
     
@@ -34,7 +43,7 @@ def list_sources():
 
 def update_llm_config(provider: str, api_key: str, model: str | None = None):
     """Update LLM configuration."""
-    config = Config()
+    config = get_config()
     
     llm_config = {
         "provider": provider,
@@ -50,10 +59,10 @@ def update_llm_config(provider: str, api_key: str, model: str | None = None):
 
 def clear_cache():
     """Clear all cached data."""
-    config = Config()
+    config = get_config()
     
-    # Clear cache files
-    cache_files = list(config.cache_dir.glob("*.json"))
+    # Clear cache files, including the compressed article bodies
+    cache_files = [*config.cache_dir.glob("*.json"), *config.cache_dir.glob("body_*.z")]
     for cache_file in cache_files:
         cache_file.unlink()
     
@@ -62,9 +71,11 @@ def clear_cache():
 
 def list_epubs():
     """List all generated EPUBs."""
-    config = Config()
+    config = get_config()
     
-    epub_files = list(config.epubs_dir.glob("*.epub"))
+    # DirEntry caches its stat result, so each file is stat'ed once
+    with os.scandir(config.epubs_dir) as it:
+        epub_files = [entry for entry in it if entry.name.endswith('.epub')]
     
     if not epub_files:
         print("No EPUB files found")
@@ -74,21 +85,18 @@ def list_epubs():
     print("=" * 25)
     
     for epub_file in sorted(epub_files, key=lambda x: x.stat().st_mtime, reverse=True):
-        size = epub_file.stat().st_size
-        mtime = epub_file.stat().st_mtime
-        
-        from datetime import datetime
-        date_str = datetime.fromtimestamp(mtime).strftime("%Y-%m-%d %H:%M")
+        stat = epub_file.stat()
+        date_str = datetime.fromtimestamp(stat.st_mtime).strftime("%Y-%m-%d %H:%M")
         
         print(f"  {epub_file.name}")
-        print(f"    Size: {size:,} bytes")
+        print(f"    Size: {stat.st_size:,} bytes")
         print(f"    Modified: {date_str}")
         print()
 
 
 def export_config():
     """Export current configuration to JSON."""
-    config = Config()
+    config = get_config()
     
     export_data = {
         "preferences": config.get_preferences(),
@@ -114,7 +122,7 @@ def import_config(config_file: str):
     with open(config_path, 'r') as f:
         import_data = json.load(f)
     
-    config = Config()
+    config = get_config()
     
     # Update preferences
     if "preferences" in import_data:
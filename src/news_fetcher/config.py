@@ -1,12 +1,56 @@
 """Configuration management for News Fetcher MCP Server."""
 
-import json
 from pathlib import Path
-from typing import Any, Dict, List, Optional
-from dataclasses import dataclass, asdict
+from typing import Any, Dict, List, Optional, Tuple
+from dataclasses import dataclass, asdict, fields
+from functools import cached_property, lru_cache
 
+import orjson
 
-@dataclass
+from news_fetcher.utils import atomic_write_bytes
+
+# Raw JSON file contents keyed by path, stored with the (mtime_ns, size) they were read at
+_JSON_CACHE: Dict[Path, Tuple[int, int, bytes]] = {}
+
+
+def _load_json_cached(path: Path) -> Any:
+    """Load a JSON file, skipping the disk read while the file is unchanged.
+    
+    Only the bytes are cached; each call parses them into fresh objects, so
+    callers never share mutable state.
+    """
+    stat = path.stat()
+    key = (stat.st_mtime_ns, stat.st_size)
+    cached = _JSON_CACHE.get(path)
+    if cached and cached[:2] == key:
+        return orjson.loads(cached[2])
+    
+    raw = path.read_bytes()
+    _JSON_CACHE[path] = (*key, raw)
+    return orjson.loads(raw)
+
+
+def _atomic_write_json(path: Path, obj: Any) -> None:
+    """Write JSON to path in a single write, replacing the file atomically."""
+    atomic_write_bytes(path, orjson.dumps(obj, option=orjson.OPT_INDENT_2))
+    _JSON_CACHE.pop(path, None)
+
+
+@lru_cache(maxsize=1024)
+def _cache_path(cache_dir: Path, cache_key: str) -> Path:
+    """Build a cache file path, reusing the Path object for repeated keys."""
+    return cache_dir / f"{cache_key}.json"
+
+
+@lru_cache(maxsize=256)
+def _epub_path(epubs_dir: Path, filename: str) -> Path:
+    """Build an EPUB file path, adding the extension when missing."""
+    if not filename.endswith('.epub'):
+        filename += '.epub'
+    return epubs_dir / filename
+
+
+@dataclass(slots=True)
 class UserPreferences:
     """User preferences and settings."""
     interests: List[str]
@@ -18,9 +62,15 @@ class UserPreferences:
     exclude_domains: List[str]
     keywords_boost: List[str]
     keywords_filter: List[str]
+    # Opt-in fuzzy dedup in search_feeds (see utils.dedup_indices)
+    near_duplicate_titles: bool = False
+    near_duplicate_content: bool = False
+
+
+_PREF_FIELDS = tuple(f.name for f in fields(UserPreferences))
 
 
-@dataclass
+@dataclass(slots=True)
 class LLMConfig:
     """LLM configuration for ranking and summarization."""
     provider: str  # "openai", "anthropic", "local", etc.
@@ -52,6 +102,8 @@ class Config:
         # Server settings
         self.opds_port = 8000
         self.cache_ttl = 3600  # 1 hour
+        self.max_fetch_concurrency = 16
+        self.max_feeds_per_search = 5  # Keeps search_feeds from waiting on too many feeds
         
         # Load configurations
         self._load_preferences()
@@ -62,56 +114,61 @@ class Config:
         """Load user preferences from file."""
         if self.preferences_file.exists():
             try:
-                with open(self.preferences_file, 'r') as f:
-                    data = json.load(f)
-                    self.preferences = UserPreferences(**data)
-            except (json.JSONDecodeError, TypeError) as e:
+                data = _load_json_cached(self.preferences_file)
+                self.preferences = UserPreferences(**data)
+            except (orjson.JSONDecodeError, TypeError) as e:
                 print(f"Error loading preferences: {e}")
         else:
             raise FileNotFoundError(f"Preferences file not found: {self.preferences_file}")
         
     def _save_preferences(self) -> None:
         """Save user preferences to file."""
-        with open(self.preferences_file, 'w') as f:
-            json.dump(asdict(self.preferences), f, indent=2)
+        _atomic_write_json(self.preferences_file, asdict(self.preferences))
     
     def _load_sources(self) -> None:
         """Load RSS/Atom sources from file."""
         
         if self.sources_file.exists():
             try:
-                with open(self.sources_file, 'r') as f:
-                    self.sources = json.load(f)
-            except json.JSONDecodeError as e:
+                self.sources = _load_json_cached(self.sources_file)
+                self._index_sources()
+            except orjson.JSONDecodeError as e:
                 print(f"Error loading sources: {e}")
         else:
             raise FileNotFoundError(f"Sources file not found: {self.sources_file}")
         
     def _save_sources(self) -> None:
         """Save sources to file."""
-        with open(self.sources_file, 'w') as f:
-            json.dump(self.sources, f, indent=2)
+        self._index_sources()
+        _atomic_write_json(self.sources_file, self.sources)
+    
+    def _index_sources(self) -> None:
+        """Build the lowercase category index used for topic lookups."""
+        self._sources_lower = {category.lower(): urls for category, urls in self.sources.items()}
     
     def _load_credentials(self) -> None:
         """Load credentials from file."""
         
         if self.credentials_file.exists():
             try:
-                with open(self.credentials_file, 'r') as f:
-                    self.credentials = json.load(f)
-            except json.JSONDecodeError as e:
+                self.credentials = _load_json_cached(self.credentials_file)
+            except orjson.JSONDecodeError as e:
                 print(f"Error loading credentials: {e}")
         else:
             raise FileNotFoundError(f"Credentials file not found: {self.credentials_file}")
 
     def _save_credentials(self) -> None:
         """Save credentials to file."""
-        with open(self.credentials_file, 'w') as f:
-            json.dump(self.credentials, f, indent=2)
+        _atomic_write_json(self.credentials_file, self.credentials)
     
     def get_preferences(self) -> Dict[str, Any]:
-        """Get current user preferences."""
-        return asdict(self.preferences)
+        """Get current user preferences.
+        
+        The dict is a shallow view: list values are the live preference lists,
+        so callers must not mutate them. Saving still goes through asdict.
+        """
+        preferences = self.preferences
+        return {name: getattr(preferences, name) for name in _PREF_FIELDS}
     
     def update_preferences(self, new_preferences: Dict[str, Any]) -> Dict[str, Any]:
         """Update user preferences."""
@@ -140,14 +197,16 @@ class Config:
     
     def get_sources_for_topic(self, topic: str) -> List[str]:
         """Get RSS sources for a specific topic."""
+        topic = topic.lower()
+        
         # Try exact match first
-        if topic.lower() in self.sources:
-            return self.sources[topic.lower()]
+        if topic in self._sources_lower:
+            return self._sources_lower[topic]
         
         # Try partial matches
         matches = []
-        for category, urls in self.sources.items():
-            if topic.lower() in category.lower() or category.lower() in topic.lower():
+        for category, urls in self._sources_lower.items():
+            if topic in category or category in topic:
                 matches.extend(urls)
         
         # If no matches, return general sources
@@ -156,8 +215,9 @@ class Config:
         
         return matches
     
-    def get_llm_config(self) -> LLMConfig:
-        """Get LLM configuration."""
+    @cached_property
+    def llm_config(self) -> LLMConfig:
+        """LLM configuration, built once from the loaded credentials."""
         llm_creds = self.credentials.get("llm", {})
         return LLMConfig(
             provider=llm_creds.get("provider", "openai"),
@@ -168,6 +228,10 @@ class Config:
             temperature=llm_creds.get("temperature", 0.7)
         )
     
+    def get_llm_config(self) -> LLMConfig:
+        """Get LLM configuration."""
+        return self.llm_config
+    
     def update_credentials(self, provider: str, credentials: Dict[str, Any]) -> None:
         """Update credentials for a specific provider."""
         if provider not in self.credentials:
@@ -175,13 +239,14 @@ class Config:
         
         self.credentials[provider].update(credentials)
         self._save_credentials()
+        
+        # Drop the cached LLM config so it is rebuilt from the new credentials
+        self.__dict__.pop('llm_config', None)
     
     def get_cache_path(self, cache_key: str) -> Path:
         """Get cache file path for a given key."""
-        return self.cache_dir / f"{cache_key}.json"
+        return _cache_path(self.cache_dir, cache_key)
     
     def get_epub_path(self, filename: str) -> Path:
         """Get EPUB file path."""
-        if not filename.endswith('.epub'):
-            filename += '.epub'
-        return self.epubs_dir / filename
\ No newline at end of file
+        return _epub_path(self.epubs_dir, filename)
\ No newline at end of file
@@ -1,12 +1,62 @@
 """LLM client for article ranking and summarization."""
 
-import json
+import re
+import orjson
 import requests
-from typing import Any, Dict, List, Optional
+from requests.adapters import HTTPAdapter
+from typing import Any, Callable, Dict, List, Optional
 from datetime import datetime
+from urllib3.util.retry import Retry
 
 from news_fetcher.config import Config, LLMConfig
 
+# Matches the JSON index array in a ranking response
+_RANK_JSON_RE = re.compile(r'\[[\d,\s]+\]')
+
+_RANKING_PROMPT = """Rank these news articles by relevance to the topic "{topic}", also weighing recency, source credibility and depth of coverage.
+
+idx\ttitle\tsrc\tdate\tsummary
+{articles_text}
+
+Return ONLY a JSON array of the 5 most relevant indices, most relevant first, like: [3, 1, 7, 2, 9]
+"""
+
+_SUMMARIZATION_PROMPT = """You are a news editor creating a daily news summary. Based on the following {count} articles, create a concise front-page style summary.
+
+Articles:
+{articles_text}
+
+Create a summary that includes:
+1. A brief overview paragraph
+2. 3-5 key bullet points highlighting the most important stories
+3. Any significant numbers, dates, or developments mentioned
+4. Keep it under 300 words total
+
+Focus on the most newsworthy and impactful stories. Write in a professional news style.
+"""
+
+# Shared session so connections to the provider stay alive across clients and calls
+_SESSION = requests.Session()
+_adapter = HTTPAdapter(
+    pool_connections=4,
+    pool_maxsize=8,
+    max_retries=Retry(
+        total=2,
+        backoff_factor=0.3,
+        status_forcelist=[429, 500, 502, 503, 504],
+        allowed_methods=frozenset({"POST"})
+    )
+)
+_SESSION.mount("http://", _adapter)
+_SESSION.mount("https://", _adapter)
+
+
+def _tsv_field(value: Optional[str], max_length: int) -> str:
+    """Truncate a value for a tab-separated prompt row, keeping it on one line."""
+    if not value:
+        return ""
+    return value[:max_length].replace("\t", " ").replace("\n", " ")
+
 
 class LLMClient:
     """Client for LLM-based article ranking and summarization."""
@@ -14,6 +64,32 @@ class LLMClient:
     def __init__(self, config: Config):
         self.config = config
         self.llm_config = config.get_llm_config()
+        
+        # Request parts that stay the same for every call
+        self._openai_headers = {
+            "Authorization": f"Bearer {self.llm_config.api_key}",
+            "Content-Type": "application/json"
+        }
+        self._anthropic_headers = {
+            "x-api-key": self.llm_config.api_key,
+            "Content-Type": "application/json",
+            "anthropic-version": "2024-06-01"
+        }
+        self._local_headers = {"Content-Type": "application/json"}
+        self._chat_payload = {
+            "model": self.llm_config.model,
+            "max_tokens": self.llm_config.max_tokens,
+            "temperature": self.llm_config.temperature,
+            "stream": True
+        }
+        self._local_payload = {
+            "model": self.llm_config.model,
+            "stream": False,
+            "options": {
+                "temperature": self.llm_config.temperature,
+                "num_predict": self.llm_config.max_tokens
+            }
+        }
     
     def is_available(self) -> bool:
         """Check if LLM is available and configured."""
@@ -39,7 +115,8 @@ class LLMClient:
                 article_summaries.append(summary)
             
             prompt = self._create_ranking_prompt(article_summaries, topic)
-            response = self._call_llm(prompt)
+            # Stop streaming as soon as the index array has been received
+            response = self._call_llm(prompt, stop_pattern=_RANK_JSON_RE)
             
             if response:
                 # Parse LLM response to get ranking
@@ -76,69 +153,40 @@ class LLMClient:
             return None
     
     def _create_ranking_prompt(self, articles: List[Dict[str, Any]], topic: str) -> str:
-        """Create prompt for article ranking."""
-        articles_text = ""
-        for article in articles:
-            articles_text += f"Index {article['index']}: {article['title']}\n"
-            articles_text += f"Source: {article['source']}\n"
-            articles_text += f"Summary: {article['summary'][:200]}...\n"
-            articles_text += f"Published: {article['published']}\n\n"
+        """Create prompt for article ranking, with one tab-separated row per article."""
+        rows = "\n".join(
+            f"{article['index']}\t{_tsv_field(article['title'], 100)}\t{_tsv_field(article['source'], 20)}"
+            f"\t{_tsv_field(article['published'], 10)}\t{_tsv_field(article['summary'], 120)}"
+            for article in articles
+        )
         
-        prompt = f"""You are a news curator tasked with ranking articles by relevance to the topic "{topic}".
-
-Articles to rank:
-{articles_text}
-
-Please rank these articles by relevance to "{topic}" and return ONLY the top 5 article indices in order of relevance (most relevant first). 
-
-Ranking criteria:
-1. Direct relevance to the topic
-2. Recency and newsworthiness
-3. Source credibility
-4. Depth of coverage
-
-Respond with ONLY a JSON array of indices, like: [3, 1, 7, 2, 9]
-"""
-        return prompt
+        return _RANKING_PROMPT.format(topic=topic, articles_text=rows)
     
     def _create_summarization_prompt(self, articles: List[Dict[str, Any]]) -> str:
         """Create prompt for article summarization."""
-        articles_text = ""
+        parts = []
         for i, article in enumerate(articles[:10]):  # Limit to avoid token limits
-            articles_text += f"{i+1}. {article.get('title', 'No title')}\n"
-            articles_text += f"   Source: {article.get('source', 'Unknown')}\n"
+            parts.append(f"{i+1}. {article.get('title', 'No title')}\n")
+            parts.append(f"   Source: {article.get('source', 'Unknown')}\n")
             
             summary_text = article.get('summary', article.get('text', ''))
             if summary_text:
-                articles_text += f"   Summary: {summary_text[:300]}...\n"
+                parts.append(f"   Summary: {summary_text[:300]}...\n")
             
             if article.get('published'):
-                articles_text += f"   Published: {article['published']}\n"
+                parts.append(f"   Published: {article['published']}\n")
             
-            articles_text += "\n"
+            parts.append("\n")
         
-        prompt = f"""You are a news editor creating a daily news summary. Based on the following {len(articles)} articles, create a concise front-page style summary.
-
-Articles:
-{articles_text}
-
-Create a summary that includes:
-1. A brief overview paragraph
-2. 3-5 key bullet points highlighting the most important stories
-3. Any significant numbers, dates, or developments mentioned
-4. Keep it under 300 words total
-
-Focus on the most newsworthy and impactful stories. Write in a professional news style.
-"""
-        return prompt
+        return _SUMMARIZATION_PROMPT.format(count=len(articles), articles_text=''.join(parts))
     
-    def _call_llm(self, prompt: str) -> Optional[str]:
+    def _call_llm(self, prompt: str, stop_pattern: Optional[re.Pattern] = None) -> Optional[str]:
         """Make API call to LLM provider."""
         try:
             if self.llm_config.provider.lower() == "openai":
-                return self._call_openai(prompt)
+                return self._call_openai(prompt, stop_pattern)
             elif self.llm_config.provider.lower() == "anthropic":
-                return self._call_anthropic(prompt)
+                return self._call_anthropic(prompt, stop_pattern)
             elif self.llm_config.provider.lower() == "local":
                 return self._call_local_llm(prompt)
             else:
@@ -148,54 +196,55 @@ Focus on the most newsworthy and impactful stories. Write in a professional news
             print(f"Error calling LLM: {e}")
             return None
     
-    def _call_openai(self, prompt: str) -> Optional[str]:
-        """Call OpenAI API."""
-        url = self.llm_config.base_url
-        
-        headers = {
-            "Authorization": f"Bearer {self.llm_config.api_key}",
-            "Content-Type": "application/json"
-        }
-        
-        data = {
-            "model": self.llm_config.model,
-            "messages": [
-                {"role": "user", "content": prompt}
-            ],
-            "max_tokens": self.llm_config.max_tokens,
-            "temperature": self.llm_config.temperature
-        }
+    def _stream_completion(
+        self,
+        url: str,
+        headers: Dict[str, str],
+        data: Dict[str, Any],
+        extract_text: Callable[[Dict[str, Any]], Optional[str]],
+        stop_pattern: Optional[re.Pattern] = None
+    ) -> str:
+        """Post a streaming request and accumulate text from server-sent events."""
+        text = ""
+        with _SESSION.post(url, headers=headers, data=orjson.dumps(data), timeout=30, stream=True) as response:
+            response.raise_for_status()
+            
+            for line in response.iter_lines():
+                if not line.startswith(b"data:"):
+                    continue
+                
+                payload = line[5:].strip()
+                if payload == b"[DONE]":
+                    break
+                
+                chunk = extract_text(orjson.loads(payload))
+                if chunk:
+                    text += chunk
+                    # Close the connection early once the caller has what it needs
+                    if stop_pattern and stop_pattern.search(text):
+                        break
         
-        response = requests.post(url, headers=headers, json=data, timeout=30)
-        response.raise_for_status()
+        return text
+    
+    def _call_openai(self, prompt: str, stop_pattern: Optional[re.Pattern] = None) -> Optional[str]:
+        """Call OpenAI API."""
+        data = {**self._chat_payload, "messages": [{"role": "user", "content": prompt}]}
         
-        result = response.json()
-        return result["choices"][0]["message"]["content"]
+        return self._stream_completion(
+            self.llm_config.base_url, self._openai_headers, data,
+            lambda event: (event.get("choices") or [{}])[0].get("delta", {}).get("content"),
+            stop_pattern
+        )
     
-    def _call_anthropic(self, prompt: str) -> Optional[str]:
+    def _call_anthropic(self, prompt: str, stop_pattern: Optional[re.Pattern] = None) -> Optional[str]:
         """Call Anthropic API."""
-        url = self.llm_config.base_url
+        data = {**self._chat_payload, "messages": [{"role": "user", "content": prompt}]}
         
-        headers = {
-            "x-api-key": self.llm_config.api_key,
-            "Content-Type": "application/json",
-            "anthropic-version": "2024-06-01"
-        }
-        
-        data = {
-            "model": self.llm_config.model,
-            "max_tokens": self.llm_config.max_tokens,
-            "temperature": self.llm_config.temperature,
-            "messages": [
-                {"role": "user", "content": prompt}
-            ]
-        }
-        
-        response = requests.post(url, headers=headers, json=data, timeout=30)
-        response.raise_for_status()
-        
-        result = response.json()
-        return result["content"][0]["text"]
+        return self._stream_completion(
+            self.llm_config.base_url, self._anthropic_headers, data,
+            lambda event: event.get("delta", {}).get("text") if event.get("type") == "content_block_delta" else None,
+            stop_pattern
+        )
     
     def _call_local_llm(self, prompt: str) -> Optional[str]:
         """Call local LLM API (e.g., Ollama, LocalAI)."""
@@ -204,51 +253,47 @@ Focus on the most newsworthy and impactful stories. Write in a professional news
             return None
         
         url = f"{self.llm_config.base_url}/api/generate"
+        data = {**self._local_payload, "prompt": prompt}
         
-        data = {
-            "model": self.llm_config.model,
-            "prompt": prompt,
-            "stream": False,
-            "options": {
-                "temperature": self.llm_config.temperature,
-                "num_predict": self.llm_config.max_tokens
-            }
-        }
-        
-        response = requests.post(url, json=data, timeout=60)
+        response = _SESSION.post(url, headers=self._local_headers, data=orjson.dumps(data), timeout=60)
         response.raise_for_status()
         
-        result = response.json()
+        result = orjson.loads(response.content)
         return result.get("response", "")
     
     def _parse_ranking_response(self, response: str) -> Optional[List[int]]:
         """Parse LLM ranking response to extract indices."""
         try:
-            # Try to find JSON array in the response
-            import re
-            
-            # Look for JSON array pattern
-            json_match = re.search(r'\[[\d,\s]+\]', response)
-            if json_match:
-                json_str = json_match.group()
-                indices = json.loads(json_str)
-                
-                # Validate indices
-                valid_indices = []
-                for idx in indices:
-                    if isinstance(idx, int) and idx >= 0:
-                        valid_indices.append(idx)
-                
-                return valid_indices[:5]  # Return top 5
+            # Prefer the contents of the JSON array, if there is one
+            start = response.find('[')
+            end = response.find(']', start + 1) if start >= 0 else -1
+            indices = self._scan_indices(response, start + 1, end) if end > start else []
             
-            # Fallback: try to extract numbers
-            numbers = re.findall(r'\b\d+\b', response)
-            if numbers:
-                indices = [int(n) for n in numbers[:5]]
-                return indices
+            # Fallback: take the first numbers anywhere in the response
+            if not indices:
+                indices = self._scan_indices(response, 0, len(response))
             
-            return None
+            return indices or None
             
         except Exception as e:
             print(f"Error parsing ranking response: {e}")
-            return None
\ No newline at end of file
+            return None
+    
+    @staticmethod
+    def _scan_indices(text: str, start: int, end: int, limit: int = 5) -> List[int]:
+        """Collect up to `limit` non-negative integers from text[start:end] in a single pass."""
+        indices = []
+        current = -1
+        for i in range(start, end):
+            char = text[i]
+            if '0' <= char <= '9':
+                current = (current if current >= 0 else 0) * 10 + ord(char) - 48
+            elif current >= 0:
+                indices.append(current)
+                if len(indices) == limit:
+                    return indices
+                current = -1
+        
+        if current >= 0:
+            indices.append(current)
+        return indices
@@ -1,6 +1,7 @@
 """News Fetcher MCP Server - Main entry point."""
 
 import asyncio
+from functools import partial
 from typing import Any, Dict, List, Optional
 from pathlib import Path
 import sys
@@ -27,6 +28,16 @@ mcp = FastMCP("news-fetcher")
 # Load configuration
 config = Config()
 
+# Bind the configuration once so the tool wrappers only forward their arguments
+_search_feeds = partial(search_feeds, config=config)
+_fetch_article = partial(fetch_article, config=config)
+_rank_articles = partial(rank_articles, config=config)
+_summarize_collection = partial(summarize_collection, config=config)
+_build_epub = partial(build_epub, config=config)
+_publish_opds = partial(publish_opds, config=config)
+_get_preferences = config.get_preferences
+_update_preferences = config.update_preferences
+
 # Register MCP tools
 @mcp.tool()
 def news_search_feeds(
@@ -45,7 +56,7 @@ def news_search_feeds(
     Returns:
         Dict containing articles with metadata
     """
-    return search_feeds(topic=topic, sources=sources, limit=limit, config=config)
+    return _search_feeds(topic=topic, sources=sources, limit=limit)
 
 
 @mcp.tool()
@@ -60,7 +71,7 @@ def news_fetch_article(url: str) -> Dict[str, Any]:
     Returns:
         Dict containing extracted article content and metadata
     """
-    return fetch_article(url=url, config=config)
+    return _fetch_article(url=url)
 
 
 @mcp.tool()
@@ -75,7 +86,7 @@ def news_rank(items: List[Dict[str, Any]], topic: str) -> List[Dict[str, Any]]:
     Returns:
         List of top-ranked articles (Top 5)
     """
-    return rank_articles(items=items, topic=topic, config=config)
+    return _rank_articles(items=items, topic=topic)
 
 
 @mcp.tool()
@@ -89,7 +100,7 @@ def news_summarize(collection: List[Dict[str, Any]]) -> Dict[str, Any]:
     Returns:
         Dict containing summary with bullets and key information
     """
-    return summarize_collection(collection=collection, config=config)
+    return _summarize_collection(collection=collection)
 
 
 @mcp.tool()
@@ -109,7 +120,7 @@ def news_build_epub(
     Returns:
         Dict containing EPUB file path and metadata
     """
-    return build_epub(articles=articles, title=title, filename=filename, config=config)
+    return _build_epub(articles=articles, title=title, filename=filename)
 
 
 @mcp.tool()
@@ -123,7 +134,7 @@ def news_publish_opds(file_path: str) -> Dict[str, Any]:
     Returns:
         Dict containing OPDS URL and publication details
     """
-    return publish_opds(file_path=file_path, config=config)
+    return _publish_opds(file_path=file_path)
 
 
 @mcp.tool()
@@ -134,7 +145,7 @@ def news_get_preferences() -> Dict[str, Any]:
     Returns:
         Dict containing user preferences, sources, and interests
     """
-    return config.get_preferences()
+    return _get_preferences()
 
 
 @mcp.tool()
@@ -148,7 +159,7 @@ def news_update_preferences(preferences: Dict[str, Any]) -> Dict[str, Any]:
     Returns:
         Dict containing updated preferences
     """
-    return config.update_preferences(preferences)
+    return _update_preferences(preferences)
 
 
 async def start_opds_server():
@@ -161,23 +172,32 @@ async def start_opds_server():
         app, 
         host="0.0.0.0", 
         port=config.opds_port,
-        log_level="info"
+        log_level="info",
+        access_log=False  # Catalog polls are noisy; the /epubs mount logs downloads
     )
     server = uvicorn.Server(server_config)
     await server.serve()
 
 
+async def serve():
+    """Run the MCP server over stdio with the OPDS server on the same event loop."""
+    opds_task = asyncio.create_task(start_opds_server())
+    try:
+        await mcp.run_stdio_async()
+    finally:
+        # The MCP client has gone away, so stop serving the catalog too
+        opds_task.cancel()
+        await asyncio.gather(opds_task, return_exceptions=True)
+
+
 def main():
     """Main entry point for the MCP server."""
     print(f"Starting News Fetcher MCP Server v{__version__}")
     print(f"Configuration loaded from: {config.config_dir}")
     print(f"OPDS server will be available at: http://localhost:{config.opds_port}/opds")
     
-    # Start OPDS server in background
-    asyncio.create_task(start_opds_server())
-    
-    # Run MCP server
-    mcp.run()
+    # Run the MCP and OPDS servers together
+    asyncio.run(serve())
 
 
 if __name__ == "__main__":
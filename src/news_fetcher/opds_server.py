@@ -1,17 +1,250 @@
 """OPDS server for serving EPUB files to KOReader and other compatible readers."""
 
+import asyncio
+import copy
+import gzip
+import hashlib
+import logging
 import os
+import time
 from datetime import datetime
-from pathlib import Path
-from typing import List
-from xml.etree.ElementTree import Element, SubElement, tostring
+from email.utils import formatdate
+from functools import lru_cache
+from typing import Any, Dict, List, Tuple
+from urllib.parse import quote
+from xml.sax.saxutils import escape
 
-from fastapi import FastAPI, HTTPException
-from fastapi.responses import FileResponse, Response
+from fastapi import FastAPI, Request
+from fastapi.responses import Response
 from fastapi.staticfiles import StaticFiles
+from lxml import etree
 
 from news_fetcher.config import Config
 
+logger = logging.getLogger("uvicorn.error")
+
+RECENT_WINDOW = 30 * 24 * 60 * 60  # 30 days
+RESCAN_INTERVAL = 5.0  # seconds
+
+# Feed timestamps have second resolution and are always UTC
+_ATOM_TIME_FORMAT = "%Y-%m-%dT%H:%M:%SZ"
+_now_cache = [0, ""]
+
+# English month names, so entry dates do not depend on the locale
+_MONTHS = (
+    "January", "February", "March", "April", "May", "June",
+    "July", "August", "September", "October", "November", "December"
+)
+
+_FEED_NSMAP = {None: "http://www.w3.org/2005/Atom", "opds": "http://opds-spec.org/2010/catalog"}
+_FEED_END = b"</feed>"
+
+# Entries are plain fragments; only the title, id and href vary per file
+_CATALOG_ENTRY_TMPL = (
+    '<entry><id>urn:uuid:epub-{stem}</id><title>{title}</title><updated>{updated}</updated>'
+    '<content type="text">News articles compiled on {date}</content>'
+    '<link rel="http://opds-spec.org/acquisition" href="/epubs/{href}" type="application/epub+zip"'
+    ' title="Download EPUB" length="{size}"/>'
+    '<category scheme="http://www.bisg.org/standards/bisac_subject/index.html" term="NEWS" label="News"/>'
+    '</entry>'
+)
+_RECENT_ENTRY_TMPL = (
+    '<entry><id>urn:uuid:epub-{stem}</id><title>{title}</title><updated>{updated}</updated>'
+    '<summary>News collection from {date}</summary>'
+    '<link rel="http://opds-spec.org/acquisition" href="/epubs/{href}" type="application/epub+zip"'
+    ' length="{size}"/>'
+    '</entry>'
+)
+
+
+def _list_epubs(epubs_dir: str) -> List[Tuple[str, str, float, int]]:
+    """List (name, stem, mtime, size) for the EPUBs in a directory, newest first."""
+    with os.scandir(epubs_dir) as it:
+        epubs = [
+            (entry.name, entry.name[:-5], (stat := entry.stat()).st_mtime, stat.st_size)
+            for entry in it if entry.name.endswith(".epub") and entry.is_file()
+        ]
+    epubs.sort(key=lambda epub: epub[2], reverse=True)
+    return epubs
+
+
+class _DownloadLoggingStaticFiles(StaticFiles):
+    """StaticFiles that logs EPUB downloads, which stay visible with uvicorn's access log off."""
+    
+    async def get_response(self, path: str, scope) -> Response:
+        response = await super().get_response(path, scope)
+        client = scope.get("client")
+        logger.info(
+            '%s - "%s /epubs/%s" %d',
+            client[0] if client else "-", scope["method"], path, response.status_code
+        )
+        return response
+
+
+class _EpubIndex:
+    """In-memory EPUB listing that only rescans the directory when it may have changed."""
+    
+    def __init__(self, epubs_dir: str, max_age: float = RESCAN_INTERVAL):
+        self.epubs_dir = epubs_dir
+        self.max_age = max_age
+        self.entries: List[Tuple[str, str, float, int]] = []
+        self.version = 0
+        self._dir_mtime = None
+        self._scanned_at = float("-inf")
+    
+    def refresh(self) -> List[Tuple[str, str, float, int]]:
+        """Return the current listing, bumping `version` whenever it changes."""
+        # Adding, removing or renaming a file touches the directory itself; files
+        # rewritten in place are picked up by the periodic rescan instead.
+        dir_mtime = os.stat(self.epubs_dir).st_mtime_ns
+        now = time.monotonic()
+        if dir_mtime != self._dir_mtime or now - self._scanned_at >= self.max_age:
+            entries = _list_epubs(self.epubs_dir)
+            if entries != self.entries:
+                self.entries = entries
+                self.version += 1
+            self._dir_mtime = dir_mtime
+            self._scanned_at = now
+        return self.entries
+
+
+def _catalog_feed_template() -> etree._Element:
+    """Build the static part of the main catalog feed."""
+    feed = etree.Element("feed", nsmap=_FEED_NSMAP)
+    
+    # Feed metadata
+    id_elem = etree.SubElement(feed, "id")
+    id_elem.text = "urn:uuid:news-fetcher-opds"
+    
+    title = etree.SubElement(feed, "title")
+    title.text = "News Fetcher EPUB Catalog"
+    
+    # Filled in per build
+    etree.SubElement(feed, "updated")
+    
+    author = etree.SubElement(feed, "author")
+    author_name = etree.SubElement(author, "name")
+    author_name.text = "News Fetcher MCP"
+    
+    # Self link
+    self_link = etree.SubElement(feed, "link")
+    self_link.set("rel", "self")
+    self_link.set("href", "/opds")
+    self_link.set("type", "application/atom+xml;profile=opds-catalog;kind=navigation")
+    
+    # Start link
+    start_link = etree.SubElement(feed, "link")
+    start_link.set("rel", "start")
+    start_link.set("href", "/opds")
+    start_link.set("type", "application/atom+xml;profile=opds-catalog;kind=navigation")
+    
+    return feed
+
+
+def _recent_feed_template() -> etree._Element:
+    """Build the static part of the recent entries feed."""
+    feed = etree.Element("feed", nsmap=_FEED_NSMAP)
+    
+    # Feed metadata
+    id_elem = etree.SubElement(feed, "id")
+    id_elem.text = "urn:uuid:news-fetcher-recent"
+    
+    title = etree.SubElement(feed, "title")
+    title.text = "Recent News EPUBs"
+    
+    # Filled in per build
+    etree.SubElement(feed, "updated")
+    
+    # Links
+    self_link = etree.SubElement(feed, "link")
+    self_link.set("rel", "self")
+    self_link.set("href", "/opds/recent")
+    self_link.set("type", "application/atom+xml;profile=opds-catalog;kind=acquisition")
+    
+    up_link = etree.SubElement(feed, "link")
+    up_link.set("rel", "up")
+    up_link.set("href", "/opds")
+    up_link.set("type", "application/atom+xml;profile=opds-catalog;kind=navigation")
+    
+    return feed
+
+
+# Feed headers only differ in <updated>, so builds copy these instead of reassembling them
+_CATALOG_FEED_TEMPLATE = _catalog_feed_template()
+_RECENT_FEED_TEMPLATE = _recent_feed_template()
+
+
+@lru_cache(maxsize=2048)
+def _pretty_title(stem: str) -> str:
+    """Turn an EPUB file stem into a display title."""
+    return stem.replace('-', ' ').replace('_', ' ').title()
+
+
+@lru_cache(maxsize=4096)
+def _format_mtime(mtime: int) -> Tuple[str, str]:
+    """Format a whole-second modification time as (Atom timestamp, human readable date)."""
+    t = time.gmtime(mtime)
+    return (
+        f"{t.tm_year:04d}-{t.tm_mon:02d}-{t.tm_mday:02d}T{t.tm_hour:02d}:{t.tm_min:02d}:{t.tm_sec:02d}Z",
+        f"{_MONTHS[t.tm_mon - 1]} {t.tm_mday:02d}, {t.tm_year}"
+    )
+
+
+def _now_iso() -> str:
+    """Current UTC time as an Atom timestamp, formatted at most once per second."""
+    now = int(time.time())
+    if now != _now_cache[0]:
+        _now_cache[0] = now
+        _now_cache[1] = time.strftime(_ATOM_TIME_FORMAT, time.gmtime(now))
+    return _now_cache[1]
+
+
+@lru_cache(maxsize=4096)
+def _render_catalog_entry(name: str, stem: str, mtime: float, size: int) -> bytes:
+    """Serialize a main catalog entry; the mtime and size in the key invalidate changed files."""
+    updated, human_date = _format_mtime(int(mtime))
+    return _CATALOG_ENTRY_TMPL.format(
+        stem=escape(stem), title=escape(_pretty_title(stem)), updated=updated,
+        date=human_date, href=quote(name), size=size
+    ).encode('utf-8')
+
+
+@lru_cache(maxsize=4096)
+def _render_recent_entry(name: str, stem: str, mtime: float, size: int) -> bytes:
+    """Serialize a recent feed entry."""
+    updated, human_date = _format_mtime(int(mtime))
+    return _RECENT_ENTRY_TMPL.format(
+        stem=escape(stem), title=escape(_pretty_title(stem)), updated=updated,
+        date=human_date, href=quote(name), size=size
+    ).encode('utf-8')
+
+
+def _cache_feed(xml: bytes, newest_mtime: float) -> Dict[str, Any]:
+    """Prepare a serialized feed for reuse: gzipped copy plus validators."""
+    headers = {
+        "ETag": f'W/"{hashlib.blake2b(xml, digest_size=8).hexdigest()}"',
+        "Vary": "Accept-Encoding"
+    }
+    if newest_mtime:
+        headers["Last-Modified"] = formatdate(newest_mtime, usegmt=True)
+    return {"xml": xml, "xml_gz": gzip.compress(xml, mtime=0), "headers": headers}
+
+
+def _feed_response(request: Request, feed: Dict[str, Any], media_type: str) -> Response:
+    """Send a cached feed, answering revalidations with 304 and gzip clients with the compressed copy."""
+    headers = feed["headers"]
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and headers["ETag"] in [tag.strip() for tag in if_none_match.split(",")]:
+        return Response(status_code=304, headers=headers)
+    
+    if "gzip" in request.headers.get("accept-encoding", ""):
+        return Response(
+            content=feed["xml_gz"],
+            media_type=media_type,
+            headers={**headers, "Content-Encoding": "gzip"}
+        )
+    return Response(content=feed["xml"], media_type=media_type, headers=headers)
+
 
 def create_opds_app(config: Config) -> FastAPI:
     """Create FastAPI app for OPDS catalog."""
@@ -21,8 +254,16 @@ def create_opds_app(config: Config) -> FastAPI:
         version="1.0.0"
     )
     
-    # Mount static files for EPUB downloads
-    app.mount("/epubs", StaticFiles(directory=str(config.epubs_dir)), name="epubs")
+    # Converted once so handlers never go through Path objects
+    epubs_dir = str(config.epubs_dir)
+    
+    # EPUB downloads are served by the static mount, which also answers Range requests
+    app.mount("/epubs", _DownloadLoggingStaticFiles(directory=epubs_dir), name="epubs")
+    
+    # Serialized feeds are reused until the EPUB listing changes
+    epub_index = _EpubIndex(epubs_dir)
+    catalog_cache = {"version": None, "feed": None, "recent_version": None, "recent_expires": 0.0, "recent": None}
+    catalog_lock = asyncio.Lock()
     
     @app.get("/")
     async def root():
@@ -31,189 +272,78 @@ def create_opds_app(config: Config) -> FastAPI:
             "title": "News Fetcher OPDS Catalog",
             "description": "OPDS catalog for news articles converted to EPUB",
             "opds_url": "/opds",
-            "epub_count": len(list(config.epubs_dir.glob("*.epub")))
+            "epub_count": len(epub_index.refresh())
         }
     
     @app.get("/opds")
-    async def opds_catalog():
+    async def opds_catalog(request: Request):
         """Main OPDS catalog feed."""
-        # Create OPDS XML
-        feed = Element("feed")
-        feed.set("xmlns", "http://www.w3.org/2005/Atom")
-        feed.set("xmlns:opds", "http://opds-spec.org/2010/catalog")
-        
-        # Feed metadata
-        id_elem = SubElement(feed, "id")
-        id_elem.text = "urn:uuid:news-fetcher-opds"
-        
-        title = SubElement(feed, "title")
-        title.text = "News Fetcher EPUB Catalog"
-        
-        updated = SubElement(feed, "updated")
-        updated.text = datetime.now().isoformat() + "Z"
-        
-        author = SubElement(feed, "author")
-        author_name = SubElement(author, "name")
-        author_name.text = "News Fetcher MCP"
-        
-        # Self link
-        self_link = SubElement(feed, "link")
-        self_link.set("rel", "self")
-        self_link.set("href", "/opds")
-        self_link.set("type", "application/atom+xml;profile=opds-catalog;kind=navigation")
+        async with catalog_lock:
+            epubs = epub_index.refresh()
+            if catalog_cache["version"] != epub_index.version:
+                newest = epubs[0][2] if epubs else 0.0
+                catalog_cache["feed"] = _cache_feed(build_catalog(epubs), newest)
+                catalog_cache["version"] = epub_index.version
+            feed = catalog_cache["feed"]
         
-        # Start link
-        start_link = SubElement(feed, "link")
-        start_link.set("rel", "start")
-        start_link.set("href", "/opds")
-        start_link.set("type", "application/atom+xml;profile=opds-catalog;kind=navigation")
-        
-        # Get EPUB files
-        epub_files = list(config.epubs_dir.glob("*.epub"))
-        epub_files.sort(key=lambda x: x.stat().st_mtime, reverse=True)
-        
-        # Add entries for each EPUB
-        for epub_file in epub_files:
-            entry = SubElement(feed, "entry")
-            
-            # Entry ID
-            entry_id = SubElement(entry, "id")
-            entry_id.text = f"urn:uuid:epub-{epub_file.stem}"
-            
-            # Entry title
-            entry_title = SubElement(entry, "title")
-            entry_title.text = epub_file.stem.replace('-', ' ').replace('_', ' ').title()
-            
-            # Entry updated time
-            entry_updated = SubElement(entry, "updated")
-            mtime = datetime.fromtimestamp(epub_file.stat().st_mtime)
-            entry_updated.text = mtime.isoformat() + "Z"
-            
-            # Entry content
-            content = SubElement(entry, "content")
-            content.set("type", "text")
-            content.text = f"News articles compiled on {mtime.strftime('%B %d, %Y')}"
-            
-            # Download link
-            download_link = SubElement(entry, "link")
-            download_link.set("rel", "http://opds-spec.org/acquisition")
-            download_link.set("href", f"/epubs/{epub_file.name}")
-            download_link.set("type", "application/epub+zip")
-            download_link.set("title", "Download EPUB")
-            
-            # File size
-            file_size = epub_file.stat().st_size
-            download_link.set("length", str(file_size))
-            
-            # Category
-            category = SubElement(entry, "category")
-            category.set("scheme", "http://www.bisg.org/standards/bisac_subject/index.html")
-            category.set("term", "NEWS")
-            category.set("label", "News")
-        
-        # Convert to string
-        xml_str = tostring(feed, encoding='unicode')
-        
-        return Response(
-            content=xml_str,
-            media_type="application/atom+xml;profile=opds-catalog;kind=navigation"
+        return _feed_response(
+            request, feed,
+            "application/atom+xml;profile=opds-catalog;kind=navigation"
         )
     
+    def build_catalog(epubs: List[Tuple[str, str, float, int]]) -> bytes:
+        """Build the main OPDS catalog XML."""
+        feed = copy.deepcopy(_CATALOG_FEED_TEMPLATE)
+        feed.find("updated").text = _now_iso()
+        
+        # Entries are serialized separately and wedged in before the closing tag
+        header = etree.tostring(feed, xml_declaration=True, encoding='utf-8')[:-len(_FEED_END)]
+        return header + b"".join(_render_catalog_entry(*epub) for epub in epubs) + _FEED_END
+    
     @app.get("/opds/recent")
-    async def recent_entries():
+    async def recent_entries(request: Request):
         """Recent entries feed."""
-        feed = Element("feed")
-        feed.set("xmlns", "http://www.w3.org/2005/Atom")
-        feed.set("xmlns:opds", "http://opds-spec.org/2010/catalog")
-        
-        # Feed metadata
-        id_elem = SubElement(feed, "id")
-        id_elem.text = "urn:uuid:news-fetcher-recent"
-        
-        title = SubElement(feed, "title")
-        title.text = "Recent News EPUBs"
-        
-        updated = SubElement(feed, "updated")
-        updated.text = datetime.now().isoformat() + "Z"
+        async with catalog_lock:
+            epubs = epub_index.refresh()
+            # The feed also goes stale once its oldest entry leaves the recent window
+            if catalog_cache["recent_version"] != epub_index.version or time.time() >= catalog_cache["recent_expires"]:
+                xml, catalog_cache["recent_expires"] = build_recent(epubs)
+                newest = epubs[0][2] if epubs else 0.0
+                catalog_cache["recent"] = _cache_feed(xml, newest)
+                catalog_cache["recent_version"] = epub_index.version
+            feed = catalog_cache["recent"]
         
-        # Links
-        self_link = SubElement(feed, "link")
-        self_link.set("rel", "self")
-        self_link.set("href", "/opds/recent")
-        self_link.set("type", "application/atom+xml;profile=opds-catalog;kind=acquisition")
-        
-        up_link = SubElement(feed, "link")
-        up_link.set("rel", "up")
-        up_link.set("href", "/opds")
-        up_link.set("type", "application/atom+xml;profile=opds-catalog;kind=navigation")
-        
-        # Get recent EPUB files (last 30 days)
-        cutoff_time = datetime.now().timestamp() - (30 * 24 * 60 * 60)  # 30 days
-        epub_files = [
-            f for f in config.epubs_dir.glob("*.epub")
-            if f.stat().st_mtime > cutoff_time
-        ]
-        epub_files.sort(key=lambda x: x.stat().st_mtime, reverse=True)
-        
-        # Add entries
-        for epub_file in epub_files[:20]:  # Limit to 20 recent files
-            entry = SubElement(feed, "entry")
-            
-            entry_id = SubElement(entry, "id")
-            entry_id.text = f"urn:uuid:epub-{epub_file.stem}"
-            
-            entry_title = SubElement(entry, "title")
-            entry_title.text = epub_file.stem.replace('-', ' ').replace('_', ' ').title()
-            
-            entry_updated = SubElement(entry, "updated")
-            mtime = datetime.fromtimestamp(epub_file.stat().st_mtime)
-            entry_updated.text = mtime.isoformat() + "Z"
-            
-            summary = SubElement(entry, "summary")
-            summary.text = f"News collection from {mtime.strftime('%B %d, %Y')}"
-            
-            download_link = SubElement(entry, "link")
-            download_link.set("rel", "http://opds-spec.org/acquisition")
-            download_link.set("href", f"/epubs/{epub_file.name}")
-            download_link.set("type", "application/epub+zip")
-            download_link.set("length", str(epub_file.stat().st_size))
-        
-        xml_str = tostring(feed, encoding='unicode')
-        return Response(
-            content=xml_str,
-            media_type="application/atom+xml;profile=opds-catalog;kind=acquisition"
+        return _feed_response(
+            request, feed,
+            "application/atom+xml;profile=opds-catalog;kind=acquisition"
         )
     
-    @app.get("/epub/{filename}")
-    async def download_epub(filename: str):
-        """Download specific EPUB file."""
-        epub_path = config.epubs_dir / filename
-        
-        if not epub_path.exists():
-            raise HTTPException(status_code=404, detail="EPUB file not found")
+    def build_recent(epubs: List[Tuple[str, str, float, int]]) -> Tuple[bytes, float]:
+        """Build the recent entries XML and the time at which it expires."""
+        feed = copy.deepcopy(_RECENT_FEED_TEMPLATE)
+        feed.find("updated").text = _now_iso()
         
-        if not epub_path.suffix.lower() == '.epub':
-            raise HTTPException(status_code=400, detail="File is not an EPUB")
+        # Get recent EPUB files (last 30 days)
+        cutoff_time = time.time() - RECENT_WINDOW
+        recent = [epub for epub in epubs if epub[2] > cutoff_time][:20]  # Limit to 20 recent files
+        expires = (recent[-1][2] + RECENT_WINDOW) if recent else float("inf")
         
-        return FileResponse(
-            path=str(epub_path),
-            media_type="application/epub+zip",
-            filename=filename
-        )
+        header = etree.tostring(feed, xml_declaration=True, encoding='utf-8')[:-len(_FEED_END)]
+        return header + b"".join(_render_recent_entry(*epub) for epub in recent) + _FEED_END, expires
     
     @app.get("/catalog.xml")
-    async def catalog_xml():
+    async def catalog_xml(request: Request):
         """Alternative OPDS catalog endpoint."""
-        return await opds_catalog()
+        return await opds_catalog(request)
     
     @app.get("/health")
     async def health_check():
         """Health check endpoint."""
-        epub_count = len(list(config.epubs_dir.glob("*.epub")))
+        epub_count = len(epub_index.refresh())
         return {
             "status": "healthy",
             "epub_count": epub_count,
-            "epubs_dir": str(config.epubs_dir),
+            "epubs_dir": epubs_dir,
             "timestamp": datetime.now().isoformat()
         }
     
@@ -230,4 +360,5 @@ def start_opds_server(config: Config, host: str = "0.0.0.0", port: int = 8000):
     print(f"OPDS catalog available at: http://{host}:{port}/opds")
     print(f"For KOReader, add catalog URL: http://{host}:{port}/opds")
     
-    uvicorn.run(app, host=host, port=port)
\ No newline at end of file
+    # Readers poll the catalog often; downloads are logged by the /epubs mount
+    uvicorn.run(app, host=host, port=port, access_log=False)
\ No newline at end of file
@@ -1,24 +1,31 @@
 """MCP tools for news fetching, processing, and management."""
 
 import hashlib
-import json
+import html
+import re
+import threading
 import time
-from datetime import datetime, timedelta
+import zlib
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from functools import lru_cache
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Tuple
 from urllib.parse import urljoin, urlparse
 
-import feedparser
+import httpx
+import lxml.html
+import orjson
 import requests
-import trafilatura
-from bs4 import BeautifulSoup
 from dateutil import parser as date_parser
-from ebooklib import epub
-from readability import Document
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 from news_fetcher.config import Config
 from news_fetcher.llm_client import LLMClient
 from news_fetcher.utils import (
+    atomic_write_bytes,
     clean_text,
     deduplicate_articles,
     extract_domain,
@@ -27,6 +34,258 @@ from news_fetcher.utils import (
     normalize_url,
 )
 
+# Numbers worth quoting in the heuristic summary, e.g. 2,500 or 3.75
+_NUMBER_RE = re.compile(r'\b\d+(?:,\d{3})*(?:\.\d+)?\b')
+
+# Upper bound on feeds fetched at the same time
+MAX_FEED_WORKERS = 16
+
+# Shared session so repeat requests to a host reuse the TCP/TLS connection
+_SESSION = requests.Session()
+_SESSION.headers['User-Agent'] = 'News-Fetcher-MCP/1.0'
+_adapter = HTTPAdapter(
+    pool_connections=32,
+    pool_maxsize=32,
+    # Read timeouts are not retried: a slow feed would otherwise hold up search_feeds several times over
+    max_retries=Retry(total=2, read=0, backoff_factor=0.3)
+)
+_SESSION.mount("http://", _adapter)
+_SESSION.mount("https://", _adapter)
+
+
+# Browser-like headers for article pages, which some sites require
+_ARTICLE_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/118.0.0.0 Safari/537.36',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
+    'Accept-Language': 'en-US,en;q=0.5',
+    'Accept-Encoding': 'gzip, deflate',
+    'Upgrade-Insecure-Requests': '1'
+}
+
+# Article pages often share a publisher host, so HTTP/2 lets concurrent fetches
+# multiplex over one connection when the optional h2 package is installed
+try:
+    import h2  # noqa: F401
+    _HTTP2 = True
+except ImportError:
+    _HTTP2 = False
+
+_ARTICLE_CLIENT = httpx.Client(
+    headers=_ARTICLE_HEADERS,
+    timeout=15.0,
+    follow_redirects=True,
+    transport=httpx.HTTPTransport(
+        http2=_HTTP2,
+        retries=2,
+        limits=httpx.Limits(max_connections=32, max_keepalive_connections=16)
+    )
+)
+
+
+# The page is parsed as UTF-8 bytes, the same way Readability parses it
+_HTML_PARSER = lxml.html.HTMLParser(encoding='utf-8')
+
+
+def _meta_content(tree: lxml.html.HtmlElement, *selectors: Tuple[str, str]) -> str:
+    """Content of the first <meta> matching one of the (attribute, value) selectors."""
+    for attr, value in selectors:
+        found = tree.xpath(f'//meta[@{attr}=$value]/@content', value=value)
+        if found:
+            return found[0]
+    return ""
+
+
+# Process-local layer above the disk cache: cache path -> (monotonic expiry, parsed data)
+MEM_CACHE_SIZE = 1024
+_MEM_CACHE: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+_MEM_CACHE_LOCK = threading.Lock()
+
+
+def _mem_cache_get(key: str) -> Any:
+    """Return a live in-memory cache entry, or None."""
+    with _MEM_CACHE_LOCK:
+        entry = _MEM_CACHE.get(key)
+        if entry is None:
+            return None
+        if time.monotonic() >= entry[0]:
+            del _MEM_CACHE[key]
+            return None
+        _MEM_CACHE.move_to_end(key)
+        return entry[1]
+
+
+def _mem_cache_put(key: str, value: Any, ttl: float) -> None:
+    """Remember a parsed cache entry for ttl seconds, evicting the least recently used."""
+    if ttl <= 0:
+        return
+    with _MEM_CACHE_LOCK:
+        _MEM_CACHE[key] = (time.monotonic() + ttl, value)
+        _MEM_CACHE.move_to_end(key)
+        if len(_MEM_CACHE) > MEM_CACHE_SIZE:
+            _MEM_CACHE.popitem(last=False)
+
+
+def _copy_articles(articles: List[Dict[str, Any]], limit: Optional[int] = None) -> List[Dict[str, Any]]:
+    """Copy cached feed articles so callers cannot modify the cache entry."""
+    return [dict(article) for article in articles[:limit]]
+
+
+@lru_cache(maxsize=4096)
+def _cache_key(url: str) -> str:
+    """Short, stable cache key for a URL."""
+    return hashlib.blake2b(url.encode('utf-8'), digest_size=8).hexdigest()
+
+
+@lru_cache(maxsize=128)
+def _keyword_weights(
+    topic: str,
+    keywords_boost: Tuple[str, ...],
+    keywords_filter: Tuple[str, ...]
+) -> Tuple[Tuple[str, float, float], ...]:
+    """Build one (keyword, title weight, summary weight) table for ranking, merging repeated keywords."""
+    weights: Dict[str, List[float]] = {}
+    
+    def add(keyword: str, title_weight: float, summary_weight: float) -> None:
+        entry = weights.setdefault(keyword.lower(), [0.0, 0.0])
+        entry[0] += title_weight
+        entry[1] += summary_weight
+    
+    add(topic, 15.0, 10.0)
+    for keyword in keywords_boost:
+        add(keyword, 8.0, 5.0)
+    for keyword in keywords_filter:
+        add(keyword, -20.0, -10.0)  # Filter keywords reduce the score
+    
+    return tuple((keyword, title_weight, summary_weight) for keyword, (title_weight, summary_weight) in weights.items())
+
+
+# Article bodies compress several-fold; a low level keeps cache writes cheap
+BODY_COMPRESSION_LEVEL = 3
+
+
+def _body_path(config: Config, content_hash: str) -> Path:
+    """Cache path of a zlib-compressed, content-addressed article body."""
+    return config.get_cache_path(f"body_{content_hash}").with_suffix('.z')
+
+
+def _store_body(body_path: Path, text: str) -> None:
+    """Write a content-addressed article body unless an identical one is already cached."""
+    if body_path.exists():
+        return
+    atomic_write_bytes(body_path, zlib.compress(text.encode('utf-8'), BODY_COMPRESSION_LEVEL))
+
+
+def _fetch_feed(feed_url: str, config: Config) -> Tuple[List[Dict[str, Any]], List[str]]:
+    """Fetch and parse a single feed, returning its articles and any errors."""
+    import feedparser
+    
+    errors = []
+    
+    try:
+        # Check cache first
+        cache_key = _cache_key(feed_url)
+        cache_path = config.get_cache_path(f"feed_{cache_key}")
+        mem_key = str(cache_path)
+        
+        cached_articles = _mem_cache_get(mem_key)
+        if cached_articles is not None:
+            return _copy_articles(cached_articles, config.preferences.max_articles_per_feed), errors
+        
+        cached_data = None
+        if cache_path.exists():
+            try:
+                with open(cache_path, 'rb') as f:
+                    cached_data = orjson.loads(f.read())
+                    cache_time = datetime.fromisoformat(cached_data['timestamp'])
+                    
+                    # Use cache if less than TTL
+                    remaining = config.cache_ttl - (datetime.now() - cache_time).total_seconds()
+                    if remaining > 0:
+                        _mem_cache_put(mem_key, cached_data['articles'], remaining)
+                        return _copy_articles(cached_data['articles'], config.preferences.max_articles_per_feed), errors
+            except (orjson.JSONDecodeError, KeyError, ValueError):
+                cached_data = None
+        
+        # Revalidate an expired cache entry instead of downloading the feed again
+        headers = {}
+        if cached_data:
+            if cached_data.get('etag'):
+                headers['If-None-Match'] = cached_data['etag']
+            if cached_data.get('last_modified'):
+                headers['If-Modified-Since'] = cached_data['last_modified']
+        
+        # Fetch feed
+        print(f"Fetching feed: {feed_url}")
+        response = _SESSION.get(feed_url, timeout=10, headers=headers)
+        
+        if response.status_code == 304 and cached_data:
+            cached_data['timestamp'] = datetime.now().isoformat()
+            atomic_write_bytes(cache_path, orjson.dumps(cached_data))
+            _mem_cache_put(mem_key, cached_data['articles'], config.cache_ttl)
+            return _copy_articles(cached_data['articles'], config.preferences.max_articles_per_feed), errors
+        
+        response.raise_for_status()
+        
+        # Parse feed
+        feed = feedparser.parse(response.content)
+        
+        if feed.bozo and not feed.entries:
+            errors.append(f"Failed to parse feed: {feed_url}")
+            return [], errors
+        
+        feed_articles = []
+        for entry in feed.entries[:config.preferences.max_articles_per_feed]:
+            try:
+                # Extract article data, preferring the UTC dates feedparser has already parsed
+                published = None
+                parsed = entry.get('published_parsed') or entry.get('updated_parsed')
+                if parsed:
+                    published = datetime(*parsed[:6], tzinfo=timezone.utc).isoformat()
+                else:
+                    raw_date = entry.get('published') or entry.get('updated')
+                    if raw_date:
+                        try:
+                            published = date_parser.parse(raw_date).isoformat()
+                        except:
+                            pass
+                
+                article = {
+                    'title': clean_text(entry.get('title', 'No title')),
+                    'url': normalize_url(entry.get('link', '')),
+                    'summary': clean_text(entry.get('summary', '')),
+                    'published': published,
+                    'author': entry.get('author', ''),
+                    'source': feed.feed.get('title', extract_domain(feed_url)),
+                    'source_url': feed_url,
+                    'domain': extract_domain(entry.get('link', '')),
+                    'tags': [tag.term for tag in getattr(entry, 'tags', [])],
+                    'fetched_at': datetime.now().isoformat()
+                }
+                
+                # Filter by domain exclusions
+                if article['domain'] not in config.preferences.exclude_domains:
+                    feed_articles.append(article)
+                    
+            except Exception as e:
+                errors.append(f"Error processing entry from {feed_url}: {str(e)}")
+                continue
+        
+        # Cache the results
+        cache_data = {
+            'timestamp': datetime.now().isoformat(),
+            'etag': response.headers.get('ETag'),
+            'last_modified': response.headers.get('Last-Modified'),
+            'articles': feed_articles
+        }
+        atomic_write_bytes(cache_path, orjson.dumps(cache_data))
+        _mem_cache_put(mem_key, feed_articles, config.cache_ttl)
+        
+        return _copy_articles(feed_articles), errors
+    
+    except Exception as e:
+        errors.append(f"Error fetching feed {feed_url}: {str(e)}")
+        return [], errors
+
 
 def search_feeds(
     topic: Optional[str] = None,
@@ -70,94 +329,19 @@ def search_feeds(
     articles = []
     errors = []
     
-    for feed_url in feed_urls[:5]:  # Limit to 5 feeds to avoid timeout
-        try:
-            # Check cache first
-            cache_key = hashlib.md5(feed_url.encode()).hexdigest()
-            cache_path = config.get_cache_path(f"feed_{cache_key}")
-            
-            cached_data = None
-            if cache_path.exists():
-                try:
-                    with open(cache_path, 'r') as f:
-                        cached_data = json.load(f)
-                        cache_time = datetime.fromisoformat(cached_data['timestamp'])
-                        
-                        # Use cache if less than TTL
-                        if datetime.now() - cache_time < timedelta(seconds=config.cache_ttl):
-                            articles.extend(cached_data['articles'][:config.preferences.max_articles_per_feed])
-                            continue
-                except (json.JSONDecodeError, KeyError, ValueError):
-                    pass
-            
-            # Fetch feed
-            print(f"Fetching feed: {feed_url}")
-            response = requests.get(feed_url, timeout=10, headers={
-                'User-Agent': 'News-Fetcher-MCP/1.0'
-            })
-            response.raise_for_status()
-            
-            # Parse feed
-            feed = feedparser.parse(response.content)
-            
-            if feed.bozo and not feed.entries:
-                errors.append(f"Failed to parse feed: {feed_url}")
-                continue
-            
-            feed_articles = []
-            for entry in feed.entries[:config.preferences.max_articles_per_feed]:
-                try:
-                    # Extract article data
-                    published = None
-                    if hasattr(entry, 'published'):
-                        try:
-                            published = date_parser.parse(entry.published).isoformat()
-                        except:
-                            pass
-                    
-                    if hasattr(entry, 'updated') and not published:
-                        try:
-                            published = date_parser.parse(entry.updated).isoformat()
-                        except:
-                            pass
-                    
-                    article = {
-                        'title': clean_text(entry.get('title', 'No title')),
-                        'url': normalize_url(entry.get('link', '')),
-                        'summary': clean_text(entry.get('summary', '')),
-                        'published': published,
-                        'author': entry.get('author', ''),
-                        'source': feed.feed.get('title', extract_domain(feed_url)),
-                        'source_url': feed_url,
-                        'domain': extract_domain(entry.get('link', '')),
-                        'tags': [tag.term for tag in getattr(entry, 'tags', [])],
-                        'fetched_at': datetime.now().isoformat()
-                    }
-                    
-                    # Filter by domain exclusions
-                    if article['domain'] not in config.preferences.exclude_domains:
-                        feed_articles.append(article)
-                        
-                except Exception as e:
-                    errors.append(f"Error processing entry from {feed_url}: {str(e)}")
-                    continue
-            
+    # Feeds are fetched concurrently, so total time is roughly that of the slowest feed
+    search_urls = feed_urls[:config.max_feeds_per_search]
+    with ThreadPoolExecutor(max_workers=min(MAX_FEED_WORKERS, len(search_urls))) as executor:
+        for feed_articles, feed_errors in executor.map(lambda url: _fetch_feed(url, config), search_urls):
             articles.extend(feed_articles)
-            
-            # Cache the results
-            cache_data = {
-                'timestamp': datetime.now().isoformat(),
-                'articles': feed_articles
-            }
-            with open(cache_path, 'w', encoding='utf-8') as f:
-                json.dump(cache_data, f, indent=2, ensure_ascii=False)
-                
-        except Exception as e:
-            errors.append(f"Error fetching feed {feed_url}: {str(e)}")
-            continue
+            errors.extend(feed_errors)
     
     # Remove duplicates
-    articles = deduplicate_articles(articles)
+    articles = deduplicate_articles(
+        articles,
+        near_duplicate_titles=config.preferences.near_duplicate_titles,
+        near_duplicate_content=config.preferences.near_duplicate_content
+    )
     
     # Sort by publication date (newest first)
     articles.sort(key=lambda x: x.get('published', ''), reverse=True)
@@ -194,110 +378,102 @@ def fetch_article(url: str, config: Optional[Config] = None) -> Dict[str, Any]:
     url = normalize_url(url)
     
     # Check cache first
-    cache_key = hashlib.md5(url.encode()).hexdigest()
+    cache_key = _cache_key(url)
     cache_path = config.get_cache_path(f"article_{cache_key}")
+    mem_key = str(cache_path)
+    
+    cached_article = _mem_cache_get(mem_key)
+    if cached_article is not None:
+        return dict(cached_article)
+    
     if cache_path.exists():
         try:
-            with open(cache_path, 'r') as f:
-                cached_data = json.load(f)
+            with open(cache_path, 'rb') as f:
+                cached_data = orjson.loads(f.read())
                 cache_time = datetime.fromisoformat(cached_data['fetched_at'])
                 
-                if datetime.now() - cache_time < timedelta(seconds=config.cache_ttl):
-                    return cached_data
-        except (json.JSONDecodeError, KeyError, ValueError):
+                remaining = config.cache_ttl - (datetime.now() - cache_time).total_seconds()
+                if remaining > 0:
+                    # The entry points at a body shared by every URL with the same text
+                    body_path = _body_path(config, cached_data.pop('content_hash'))
+                    try:
+                        with open(body_path, 'rb') as body_file:
+                            cached_data['text'] = zlib.decompress(body_file.read()).decode('utf-8')
+                    except (zlib.error, UnicodeDecodeError):
+                        # Drop the unreadable body so the refetch below stores it again
+                        body_path.unlink(missing_ok=True)
+                        raise
+                    _mem_cache_put(mem_key, cached_data, remaining)
+                    return dict(cached_data)
+        except (orjson.JSONDecodeError, KeyError, ValueError, OSError, zlib.error):
             pass
     
     try:
         print(f"Fetching article: {url}")
-        response = requests.get(url, timeout=15, headers={
-            'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/118.0.0.0 Safari/537.36',
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-            'Accept-Language': 'en-US,en;q=0.5',
-            'Accept-Encoding': 'gzip, deflate',
-            'Connection': 'keep-alive',
-            'Upgrade-Insecure-Requests': '1'
-        })
+        response = _ARTICLE_CLIENT.get(url)
         response.raise_for_status()
         
         html_content = response.text
         
-        extracted_content = trafilatura.extract(
+        # Extraction libraries are heavy to import and only needed on a cache miss
+        import trafilatura
+        
+        extracted = trafilatura.bare_extraction(
             html_content,
-            output_format='json',
             include_comments=False,
             include_tables=True,
             include_images=True,
-            url=url
+            url=url,
+            with_metadata=True
         )
+        # Trafilatura 2.x returns a Document object, 1.x a plain dict
+        if extracted is not None and not isinstance(extracted, dict):
+            extracted = extracted.as_dict()
         
         article_data = None
         extraction_method = "trafilatura"
         
-        if extracted_content:
-            try:
-                content_json = json.loads(extracted_content)
-                
-                text_length = len(content_json.get('text', ''))
-                if text_length > 200:  # Minimum content threshold
-                    article_data = {
-                        'title': content_json.get('title', ''),
-                        'text': content_json.get('text', ''),
-                        'author': content_json.get('author', ''),
-                        'published': content_json.get('date', ''),
-                        'description': content_json.get('description', ''),
-                        'url': url,
-                        'domain': extract_domain(url),
-                        'language': content_json.get('language', ''),
-                        'word_count': len(content_json.get('text', '').split()),
-                        'extraction_method': extraction_method
-                    }
-            except json.JSONDecodeError:
-                pass
+        if extracted:
+            text = extracted.get('text') or ''
+            if len(text) > 200:  # Minimum content threshold
+                article_data = {
+                    'title': extracted.get('title') or '',
+                    'text': text,
+                    'author': extracted.get('author') or '',
+                    'published': extracted.get('date') or '',
+                    'description': extracted.get('description') or '',
+                    'url': url,
+                    'domain': extract_domain(url),
+                    'language': extracted.get('language') or '',
+                    'word_count': len(text.split()),
+                    'extraction_method': extraction_method
+                }
         
         # Fallback to Readability if Trafilatura didn't work well
         if not article_data:
             print("Trafilatura extraction insufficient, trying Readability...")
             extraction_method = "readability"
             
-            doc = Document(html_content)
-            
-            soup = BeautifulSoup(html_content, 'html.parser')
+            from readability import Document
             
-            title = doc.title() or ""
-            if not title:
-                title_tag = soup.find('title')
-                title = title_tag.get_text().strip() if title_tag else ""
+            # Parse the page once, read metadata from it, then hand the tree to Readability
+            tree = lxml.html.document_fromstring(html_content.encode('utf-8', 'replace'), parser=_HTML_PARSER)
+            author = _meta_content(tree, ('name', 'author'), ('property', 'article:author'))
+            published = _meta_content(tree, ('property', 'article:published_time'), ('name', 'date'))
+            description = _meta_content(tree, ('name', 'description'), ('property', 'og:description'))
+            page_title = tree.findtext('.//title') or ""
             
-            author = ""
-            author_meta = soup.find('meta', attrs={'name': 'author'}) or soup.find('meta', attrs={'property': 'article:author'})
-            if author_meta:
-                try:
-                    attrs = getattr(author_meta, 'attrs', {})
-                    author = attrs.get('content', '') if attrs else ""
-                except (AttributeError, TypeError):
-                    author = ""
-            
-            published = ""
-            date_meta = soup.find('meta', attrs={'property': 'article:published_time'}) or soup.find('meta', attrs={'name': 'date'})
-            if date_meta:
-                try:
-                    attrs = getattr(date_meta, 'attrs', {})
-                    published = attrs.get('content', '') if attrs else ""
-                except (AttributeError, TypeError):
-                    published = ""
+            doc = Document(tree)
             
-            description = ""
-            desc_meta = soup.find('meta', attrs={'name': 'description'}) or soup.find('meta', attrs={'property': 'og:description'})
-            if desc_meta:
-                try:
-                    attrs = getattr(desc_meta, 'attrs', {})
-                    description = attrs.get('content', '') if attrs else ""
-                except (AttributeError, TypeError):
-                    description = ""
+            title = doc.title() or page_title.strip()
             
             content_html = doc.summary()
-            content_soup = BeautifulSoup(content_html, 'html.parser')
-            text_content = content_soup.get_text(separator='\n', strip=True)
+            text_content = ""
+            if content_html.strip():
+                content_tree = lxml.html.fromstring(content_html)
+                text_content = '\n'.join(
+                    chunk.strip() for chunk in content_tree.itertext() if chunk.strip()
+                )
             
             article_data = {
                 'title': title.strip(),
@@ -319,10 +495,17 @@ def fetch_article(url: str, config: Optional[Config] = None) -> Dict[str, Any]:
                 'error': None
             })
             
-            with open(cache_path, 'w', encoding='utf-8') as f:
-                json.dump(article_data, f, indent=2, ensure_ascii=False)
+            # Store the text once per distinct body and a small entry per URL
+            text = article_data['text']
+            content_hash = hashlib.sha256(text.encode('utf-8')).hexdigest()
+            _store_body(_body_path(config, content_hash), text)
             
-            return article_data
+            entry = {key: value for key, value in article_data.items() if key != 'text'}
+            entry['content_hash'] = content_hash
+            atomic_write_bytes(cache_path, orjson.dumps(entry))
+            _mem_cache_put(mem_key, article_data, config.cache_ttl)
+            
+            return dict(article_data)
         else:
             error_msg = "Failed to extract meaningful content from the article"
             return {
@@ -342,6 +525,27 @@ def fetch_article(url: str, config: Optional[Config] = None) -> Dict[str, Any]:
         }
 
 
+def fetch_articles_batch(urls: List[str], config: Optional[Config] = None) -> List[Dict[str, Any]]:
+    """
+    Fetch several articles concurrently over the shared connection pool.
+    
+    Args:
+        urls: URLs of the articles to fetch
+        config: Configuration object
+    
+    Returns:
+        List of fetch_article results, in the same order as urls
+    """
+    if not config:
+        config = Config()
+    
+    if not urls:
+        return []
+    
+    with ThreadPoolExecutor(max_workers=min(config.max_fetch_concurrency, len(urls))) as executor:
+        return list(executor.map(lambda url: fetch_article(url, config), urls))
+
+
 def rank_articles(
     items: List[Dict[str, Any]], 
     topic: str,
@@ -366,6 +570,12 @@ def rank_articles(
     
     # First, apply heuristic pre-ranking
     scored_items = []
+    keyword_weights = _keyword_weights(
+        topic,
+        tuple(config.preferences.keywords_boost),
+        tuple(config.preferences.keywords_filter)
+    )
+    now = datetime.now(timezone.utc)
     
     for item in items:
         score = 0.0
@@ -374,7 +584,9 @@ def rank_articles(
         if item.get('published'):
             try:
                 pub_date = date_parser.parse(item['published'])
-                days_old = (datetime.now() - pub_date).days
+                if pub_date.tzinfo is None:
+                    pub_date = pub_date.astimezone()  # Dates without a timezone are local time
+                days_old = (now - pub_date).days
                 # Exponential decay: newer articles get much higher scores
                 recency_score = max(0, 10 * (0.9 ** days_old))
                 score += recency_score
@@ -385,32 +597,14 @@ def rank_articles(
         domain_bonus = 2.0  # Base bonus for having content
         score += domain_bonus
         
-        # Keyword matching in title and summary
+        # Keyword matching in title and summary: topic relevance, boost and filter keywords
         title = item.get('title', '').lower()
         summary = item.get('summary', '').lower()
-        topic_lower = topic.lower()
-        
-        # Topic relevance
-        if topic_lower in title:
-            score += 15.0
-        if topic_lower in summary:
-            score += 10.0
-        
-        # Boost keywords
-        for keyword in config.preferences.keywords_boost:
-            keyword_lower = keyword.lower()
-            if keyword_lower in title:
-                score += 8.0
-            if keyword_lower in summary:
-                score += 5.0
-        
-        # Filter keywords (reduce score)
-        for keyword in config.preferences.keywords_filter:
-            keyword_lower = keyword.lower()
-            if keyword_lower in title:
-                score -= 20.0
-            if keyword_lower in summary:
-                score -= 10.0
+        for keyword, title_weight, summary_weight in keyword_weights:
+            if keyword in title:
+                score += title_weight
+            if keyword in summary:
+                score += summary_weight
         
         # Word count bonus (longer articles might be more substantial)
         word_count = item.get('word_count', len(item.get('summary', '').split()))
@@ -485,19 +679,12 @@ def summarize_collection(
     # Fallback to heuristic summarization
     print("Using heuristic summarization")
     
-    # Group articles by domain for diversity
-    by_domain = {}
-    for article in collection:
-        domain = article.get('domain', 'unknown')
-        if domain not in by_domain:
-            by_domain[domain] = []
-        by_domain[domain].append(article)
-    
-    # Extract key information
+    # Extract key information in a single pass
     bullet_points = []
     key_numbers = []
     dates = []
-    sources = set()
+    sources = {}  # Ordered set of source names
+    parse_date = date_parser.parse
     
     for article in collection[:10]:  # Limit for processing
         title = article.get('title', '')
@@ -510,23 +697,20 @@ def summarize_collection(
         # Add source
         source = article.get('source', article.get('domain', ''))
         if source:
-            sources.add(source)
+            sources[source] = None
         
         # Extract dates
         if article.get('published'):
             try:
-                pub_date = date_parser.parse(article['published'])
+                pub_date = parse_date(article['published'])
                 dates.append(pub_date.strftime("%B %d, %Y"))
             except:
                 pass
         
-        # Simple number extraction from titles/summaries
-        import re
-        text = f"{title} {summary}"
-        numbers = re.findall(r'\b\d+(?:,\d{3})*(?:\.\d+)?\b', text)
-        for num in numbers[:3]:  # Limit numbers per article
-            if len(num) > 2:  # Only significant numbers
-                key_numbers.append(num)
+        # Simple number extraction from titles/summaries, keeping only significant
+        # numbers among the first three found in each article
+        numbers = _NUMBER_RE.findall(f"{title} {summary}")
+        key_numbers.extend(num for num in numbers[:3] if len(num) > 2)
     
     # Generate summary text
     summary_text = f"Daily News Summary - {len(collection)} articles"
@@ -536,7 +720,7 @@ def summarize_collection(
         summary_text += f"\n\nSources: {source_list}"
     
     if dates:
-        unique_dates = list(set(dates))
+        unique_dates = list(dict.fromkeys(dates))
         if unique_dates:
             summary_text += f"\n\nCoverage from: {unique_dates[0]}"
             if len(unique_dates) > 1:
@@ -588,6 +772,8 @@ def build_epub(
             "error": "No articles provided for EPUB generation"
         }
     
+    from ebooklib import epub
+    
     try:
         # Generate filename if not provided
         if not filename:
@@ -626,9 +812,11 @@ def build_epub(
         book.add_item(nav_css)
         
         # Create table of contents
-        toc_content = f"<h1>{title}</h1>\n"
-        toc_content += f"<p>Generated on {datetime.now().strftime('%B %d, %Y at %I:%M %p')}</p>\n"
-        toc_content += f"<p>{len(articles)} articles</p>\n<ul>\n"
+        toc_parts = [
+            f"<h1>{title}</h1>\n",
+            f"<p>Generated on {datetime.now().strftime('%B %d, %Y at %I:%M %p')}</p>\n",
+            f"<p>{len(articles)} articles</p>\n<ul>\n"
+        ]
         
         chapters = []
         spine = ['nav']
@@ -642,10 +830,10 @@ def build_epub(
             chapter_filename = f"chapter_{i:03d}.xhtml"
             
             # Add to TOC
-            toc_content += f"<li><a href=\"{chapter_filename}\">{article_title}</a></li>\n"
+            toc_parts.append(f"<li><a href=\"{chapter_filename}\">{article_title}</a></li>\n")
             
             # Create chapter content
-            chapter_html = f'''<?xml version="1.0" encoding="utf-8"?>
+            parts = [f'''<?xml version="1.0" encoding="utf-8"?>
 <!DOCTYPE html PUBLIC "-//W3C//DTD XHTML 1.1//EN" "http://www.w3.org/TR/xhtml11/DTD/xhtml11.dtd">
 <html xmlns="http://www.w3.org/1999/xhtml">
 <head>
@@ -655,27 +843,27 @@ def build_epub(
 <body>
     <h1>{article_title}</h1>
     <div class="article-meta">
-'''
+''']
             
             # Add metadata
             if article.get('author'):
-                chapter_html += f'<p><strong>Author:</strong> {article["author"]}</p>\n'
+                parts.append(f'<p><strong>Author:</strong> {article["author"]}</p>\n')
             
             if article.get('published'):
                 try:
                     pub_date = date_parser.parse(article['published'])
                     formatted_date = pub_date.strftime('%B %d, %Y at %I:%M %p')
-                    chapter_html += f'<p class="published-date"><strong>Published:</strong> {formatted_date}</p>\n'
+                    parts.append(f'<p class="published-date"><strong>Published:</strong> {formatted_date}</p>\n')
                 except:
-                    chapter_html += f'<p class="published-date"><strong>Published:</strong> {article["published"]}</p>\n'
+                    parts.append(f'<p class="published-date"><strong>Published:</strong> {article["published"]}</p>\n')
             
             if article.get('source'):
-                chapter_html += f'<p><strong>Source:</strong> {article["source"]}</p>\n'
+                parts.append(f'<p><strong>Source:</strong> {article["source"]}</p>\n')
             
             if article_url:
-                chapter_html += f'<p><strong>Original:</strong> <a href="{article_url}" class="source-link">{article_url}</a></p>\n'
+                parts.append(f'<p><strong>Original:</strong> <a href="{article_url}" class="source-link">{article_url}</a></p>\n')
             
-            chapter_html += '</div>\n<div class="article-content">\n'
+            parts.append('</div>\n<div class="article-content">\n')
             
             # Add content
             content = article.get('text', article.get('summary', ''))
@@ -691,11 +879,9 @@ def build_epub(
                 para = para.strip()
                 if para:
                     # Escape HTML characters
-                    import html
-                    para = html.escape(para)
-                    chapter_html += f'<p>{para}</p>\n'
+                    parts.append(f'<p>{html.escape(para)}</p>\n')
             
-            chapter_html += '</div>\n</body>\n</html>'
+            parts.append('</div>\n</body>\n</html>')
             
             # Create chapter
             chapter = epub.EpubHtml(
@@ -703,13 +889,14 @@ def build_epub(
                 file_name=chapter_filename,
                 lang='en'
             )
-            chapter.content = chapter_html
+            chapter.content = ''.join(parts).encode('utf-8')
             
             book.add_item(chapter)
             chapters.append(chapter)
             spine.append(chapter)
         
-        toc_content += "</ul>\n"
+        toc_parts.append("</ul>\n")
+        toc_content = ''.join(toc_parts)
         
         # Create introduction chapter
         intro = epub.EpubHtml(
@@ -727,7 +914,7 @@ def build_epub(
 <body>
 {toc_content}
 </body>
-</html>'''
+</html>'''.encode('utf-8')
         
         book.add_item(intro)
         spine.insert(1, intro)
@@ -1,12 +1,145 @@
 """Utility functions for the News Fetcher MCP Server."""
 
+import html
+import os
 import re
+import stat
+import sys
+import tempfile
 import hashlib
-from datetime import datetime, timedelta
-from typing import Any, Dict, List
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from email.utils import parsedate_to_datetime
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
 from urllib.parse import urlparse, urljoin
 import unicodedata
 
+from dateutil import parser as date_parser
+
+# The process umask, read once: os.umask can only be queried by setting it
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+# Patterns used by the text and filename helpers
+_WS_RE = re.compile(r'\s+')
+_SPACES_RE = re.compile(r' +')
+_BLANK_LINES_RE = re.compile(r'\n{3,}')
+_NONWORD_RE = re.compile(r'[^\w\s-]')
+# _NONWORD_RE as a translate table for ASCII-only text
+_ASCII_NONWORD_TABLE = dict.fromkeys(c for c in range(128) if _NONWORD_RE.match(chr(c)))
+_DASH_RE = re.compile(r'[-\s]+')
+_KEYWORD_RE = re.compile(r'\b[a-z]{3,}\b')
+# Same matches on ASCII-only text, without Unicode word-boundary checks
+_ASCII_KEYWORD_RE = re.compile(r'\b[a-z]{3,}\b', re.ASCII)
+
+# sanitize_filename: path separators become underscores, reserved and control characters go
+_SANITIZE_TABLE = str.maketrans({
+    '/': '_', '\\': '_',
+    **dict.fromkeys('<>:"|?*'),
+    # Only C0 controls: _strip_control would also drop format characters such as
+    # the zero-width joiners inside emoji sequences
+    **dict.fromkeys(map(chr, range(32)))
+})
+
+# Common words that never make useful keywords
+_STOP_WORDS = frozenset({
+    'the', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'with',
+    'by', 'from', 'up', 'about', 'into', 'through', 'during', 'before',
+    'after', 'above', 'below', 'between', 'among', 'upon', 'against',
+    'within', 'throughout', 'despite', 'towards', 'concerning',
+    'this', 'that', 'these', 'those', 'they', 'them', 'their', 'there',
+    'where', 'when', 'what', 'who', 'which', 'why', 'how', 'said', 'says',
+    'can', 'could', 'will', 'would', 'should', 'may', 'might', 'must',
+    'have', 'has', 'had', 'having', 'been', 'being', 'was', 'were', 'are',
+    'more', 'most', 'much', 'many', 'some', 'all', 'any', 'each', 'every',
+    'new', 'old', 'first', 'last', 'long', 'great', 'little', 'own', 'other',
+    'right', 'big', 'high', 'different', 'small', 'large', 'next', 'early',
+    'young', 'important', 'few', 'public', 'bad', 'same', 'able'
+})
+
+
+def _char_class(codepoints: List[int]) -> str:
+    """Regex character class matching the given code points, collapsed into ranges."""
+    ranges = []
+    for c in sorted(codepoints):
+        if ranges and c == ranges[-1][1] + 1:
+            ranges[-1][1] = c
+        else:
+            ranges.append([c, c])
+    return '[' + ''.join(
+        re.escape(chr(lo)) if lo == hi else f'{re.escape(chr(lo))}-{re.escape(chr(hi))}'
+        for lo, hi in ranges
+    ) + ']'
+
+
+# ASCII control characters other than newlines and tabs, for the str.translate fast path
+_CTRL_TABLE = dict.fromkeys(c for c in [*range(32), 127] if chr(c) not in '\n\r\t')
+
+
+@lru_cache(maxsize=None)
+def _control_re() -> re.Pattern:
+    """Regex matching runs of category C code points other than newlines and tabs."""
+    # Controls, format, surrogates, private use and unassigned, over the whole code space.
+    # Built on first use: scanning every code point takes a noticeable fraction of a second.
+    codepoints = [
+        c for c in range(sys.maxunicode + 1)
+        if unicodedata.category(chr(c))[0] == 'C' and chr(c) not in '\n\r\t'
+    ]
+    return re.compile(_char_class(codepoints) + '+')
+
+
+def _strip_control(text: str) -> str:
+    """Remove control characters, keeping newlines, carriage returns and tabs."""
+    # str.translate is fastest on ASCII text; for other text one regex pass beats per-character lookups
+    if text.isascii():
+        return text.translate(_CTRL_TABLE)
+    return _control_re().sub('', text)
+
+
+# MinHash near-duplicate detection: 64-value signatures split into 8 LSH bands
+# of 8 rows, which puts the candidate threshold close to a Jaccard similarity of 0.8
+_MINHASH_PERMS = 64
+_LSH_BANDS = 8
+_LSH_ROWS = _MINHASH_PERMS // _LSH_BANDS
+_NEAR_DUP_THRESHOLD = 0.8
+_SHINGLE_SIZE = 5
+_EMPTY_BIN = 1 << 64
+
+
+def _minhash(text: str) -> tuple:
+    """Compute a one-permutation MinHash signature over character shingles of text.
+    
+    Each shingle is hashed once and routed to one of the signature bins by its low
+    bits; empty bins borrow the value of the next filled bin so signatures of short
+    texts remain comparable.
+    """
+    if len(text) <= _SHINGLE_SIZE:
+        shingles = {text}
+    else:
+        shingles = {text[i:i + _SHINGLE_SIZE] for i in range(len(text) - _SHINGLE_SIZE + 1)}
+    
+    bins = [_EMPTY_BIN] * _MINHASH_PERMS
+    for shingle in shingles:
+        h = int.from_bytes(hashlib.blake2b(shingle.encode(), digest_size=8).digest(), 'little')
+        index = h % _MINHASH_PERMS
+        value = h // _MINHASH_PERMS
+        if value < bins[index]:
+            bins[index] = value
+    
+    filled = [value != _EMPTY_BIN for value in bins]
+    for i in range(_MINHASH_PERMS):
+        if not filled[i]:
+            for offset in range(1, _MINHASH_PERMS):
+                donor = (i + offset) % _MINHASH_PERMS
+                if filled[donor]:
+                    # Offset borrowed values by distance so they differ from the donor bin
+                    bins[i] = bins[donor] + (offset << 58)
+                    break
+    
+    return tuple(bins)
+
 
 def clean_text(text: str) -> str:
     """Clean and normalize text content."""
@@ -14,29 +147,32 @@ def clean_text(text: str) -> str:
         return ""
     
     # Remove extra whitespace and normalize
-    text = re.sub(r'\s+', ' ', text.strip())
+    text = _WS_RE.sub(' ', text.strip())
     
     # Remove control characters
-    text = ''.join(char for char in text if unicodedata.category(char)[0] != 'C' or char in '\n\r\t')
+    text = _strip_control(text)
     
     # Decode HTML entities
-    import html
     text = html.unescape(text)
     
     return text
 
 
+def _clean_text_lower(text: str) -> str:
+    """Lowercased clean_text, used for comparison keys."""
+    return clean_text(text).lower()
+
+
 def clean_article_text(text: str) -> str:
     """Clean article text while preserving paragraph structure and readability."""
     if not text:
         return ""
     
     # Decode HTML entities first
-    import html
     text = html.unescape(text)
     
     # Remove control characters but preserve newlines, carriage returns, and tabs
-    text = ''.join(char for char in text if unicodedata.category(char)[0] != 'C' or char in '\n\r\t')
+    text = _strip_control(text)
     
     # Split into lines to preserve paragraph structure
     lines = text.split('\n')
@@ -52,7 +188,7 @@ def clean_article_text(text: str) -> str:
             # Extract leading whitespace (tabs/spaces for indentation)
             leading_whitespace = line[:len(line) - len(content)]
             # Clean only the content part, normalize multiple spaces to single space
-            content = re.sub(r' +', ' ', content.rstrip())
+            content = _SPACES_RE.sub(' ', content.rstrip())
             cleaned_lines.append(leading_whitespace + content)
         else:
             # Empty line - preserve it for paragraph breaks
@@ -60,11 +196,36 @@ def clean_article_text(text: str) -> str:
     
     # Join lines back and clean up excessive blank lines (more than 2 consecutive)
     result = '\n'.join(cleaned_lines)
-    result = re.sub(r'\n{3,}', '\n\n', result)  # Max 2 consecutive newlines
+    result = _BLANK_LINES_RE.sub('\n\n', result)  # Max 2 consecutive newlines
     
     return result.strip()
 
 
+# Title SimHash: 64-bit signatures within this Hamming distance are near-duplicates.
+# Split into 4 bands of 16 bits, any such pair shares at least one band exactly.
+_SIMHASH_MAX_DISTANCE = 3
+_SIMHASH_BANDS = 4
+_SIMHASH_BAND_BITS = 16
+
+
+def _simhash(tokens: List[str]) -> int:
+    """Compute a 64-bit SimHash from equally weighted tokens."""
+    counts = [0] * 64
+    for token in tokens:
+        h = int.from_bytes(hashlib.blake2b(token.encode(), digest_size=8).digest(), 'little')
+        for bit in range(64):
+            counts[bit] += 1 if h >> bit & 1 else -1
+    return sum(1 << bit for bit in range(64) if counts[bit] > 0)
+
+
+# Host part of a plain http(s) URL, up to the path, query or fragment
+_NETLOC_RE = re.compile(r'https?://([^/?#\[\]\t\r\n]*)(?:[/?#]|$)')
+
+# URLs recur heavily across feeds and fetches, so parsed results are memoized
+_cached_urlparse = lru_cache(maxsize=4096)(urlparse)
+
+
+@lru_cache(maxsize=4096)
 def normalize_url(url: str) -> str:
     """Normalize URL for consistent handling."""
     if not url:
@@ -82,6 +243,17 @@ def normalize_url(url: str) -> str:
     return url
 
 
+@lru_cache(maxsize=4096)
+def _fast_domain(url: str) -> str:
+    """Lowercased host of a normalized URL without a leading "www."."""
+    # Plain http(s) URLs are split with one regex; anything urlparse treats specially
+    # (IPv6 brackets, embedded tabs/newlines in the host part) goes through urlparse
+    match = _NETLOC_RE.match(url)
+    netloc = match.group(1) if match else _cached_urlparse(url).netloc
+    return netloc.lower().removeprefix('www.')
+
+
+@lru_cache(maxsize=4096)
 def extract_domain(url: str) -> str:
     """Extract domain from URL."""
     if not url:
@@ -92,13 +264,7 @@ def extract_domain(url: str) -> str:
         return ""
     
     try:
-        parsed = urlparse(normalize_url(url))
-        domain = parsed.netloc.lower()
-        
-        if domain.startswith('www.'):
-            domain = domain[4:]
-        
-        return domain
+        return _fast_domain(normalize_url(url))
     except:
         return ""
 
@@ -108,10 +274,12 @@ def generate_filename(title: str, max_length: int = 50) -> str:
     # Clean title
     filename = clean_text(title)
     
-    # Remove or replace unsafe characters
-    filename = re.sub(r'[<>:"/\\|?*]', '', filename)
-    filename = re.sub(r'[^\w\s-]', '', filename)
-    filename = re.sub(r'[-\s]+', '-', filename)
+    # Keep only word characters, whitespace and hyphens (this also drops <>:"/\|?*)
+    if filename.isascii():
+        filename = filename.translate(_ASCII_NONWORD_TABLE)
+    else:
+        filename = _NONWORD_RE.sub('', filename)
+    filename = _DASH_RE.sub('-', filename)
     
     # Truncate if too long
     if len(filename) > max_length:
@@ -127,69 +295,172 @@ def generate_filename(title: str, max_length: int = 50) -> str:
     return filename
 
 
-def deduplicate_articles(articles: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-    """Remove duplicate articles based on URL and title similarity."""
-    if not articles:
-        return articles
+def dedup_indices(
+    urls: List[str],
+    titles: List[str],
+    summaries: Optional[List[str]] = None,
+    near_duplicate_titles: bool = False,
+    near_duplicate_content: bool = False
+) -> List[int]:
+    """Return the indices of items to keep from parallel URL, title and summary lists.
+    
+    Items are dropped when their URL or title was already seen, or when the first 50 characters
+    of the title match. With near_duplicate_titles, titles whose character-trigram SimHash
+    differs in at most three bits (punctuation, quoting or small wording changes) are also
+    treated as duplicates. With near_duplicate_content, so are items whose title+summary
+    nearly matches an earlier item; this can merge distinct stories that share a boilerplate
+    feed description, so it is off by default.
+    """
+    if summaries is None:
+        summaries = [''] * len(urls)
     
     seen_urls = set()
     seen_titles = set()
-    deduped = []
+    seen_prefixes = set()
+    # LSH buckets: one dict per band, mapping band values to signatures in that bucket
+    lsh_bands = [{} for _ in range(_LSH_BANDS)]
+    simhash_bands = [{} for _ in range(_SIMHASH_BANDS)]
+    kept = []
     
-    for article in articles:
-        url = article.get('url', '')
-        title = article.get('title', '')
-        
+    for index, (url, title, summary) in enumerate(zip(urls, titles, summaries)):
         # Normalize for comparison
         normalized_url = normalize_url(url)
-        normalized_title = clean_text(title).lower()
+        normalized_title = _clean_text_lower(title)
         
         # Skip if we've seen this URL
         if normalized_url and normalized_url in seen_urls:
             continue
         
         # Skip if we've seen a very similar title
-        title_hash = hashlib.md5(normalized_title.encode()).hexdigest()
+        title_hash = hashlib.blake2b(normalized_title.encode(), digest_size=16).digest()
         if title_hash in seen_titles:
             continue
         
-        # Check for similar titles (simple approach)
-        is_similar = False
-        for existing_title in seen_titles:
-            # If titles are very similar (same first 50 chars), skip
-            if len(normalized_title) > 20 and len(existing_title) > 20:
-                if normalized_title[:50] == existing_title[:50]:
-                    is_similar = True
-                    break
-        
-        if is_similar:
+        # Titles sharing their first 50 characters are treated as the same story
+        title_prefix = normalized_title[:50] if len(normalized_title) > 20 else None
+        if title_prefix and title_prefix in seen_prefixes:
             continue
         
+        title_keys = None
+        if near_duplicate_titles and normalized_title:
+            title_sig = _simhash([normalized_title[i:i + 3] for i in range(max(1, len(normalized_title) - 2))])
+            title_keys = [
+                title_sig >> (i * _SIMHASH_BAND_BITS) & 0xFFFF for i in range(_SIMHASH_BANDS)
+            ]
+            
+            candidates = set()
+            for band, key in zip(simhash_bands, title_keys):
+                candidates.update(band.get(key, ()))
+            
+            if any((title_sig ^ other).bit_count() <= _SIMHASH_MAX_DISTANCE for other in candidates):
+                continue
+        
+        # Skip syndicated copies whose title+summary nearly matches an earlier item
+        content = ""
+        if near_duplicate_content:
+            content = f"{normalized_title} {_clean_text_lower(summary)}".strip()
+        if content:
+            signature = _minhash(content)
+            keys = [signature[i * _LSH_ROWS:(i + 1) * _LSH_ROWS] for i in range(_LSH_BANDS)]
+            
+            candidates = set()
+            for band, key in zip(lsh_bands, keys):
+                candidates.update(band.get(key, ()))
+            
+            if any(
+                sum(x == y for x, y in zip(signature, other)) >= _NEAR_DUP_THRESHOLD * _MINHASH_PERMS
+                for other in candidates
+            ):
+                continue
+            
+            for band, key in zip(lsh_bands, keys):
+                band.setdefault(key, []).append(signature)
+        
         # Add to seen sets
         if normalized_url:
             seen_urls.add(normalized_url)
         if normalized_title:
             seen_titles.add(title_hash)
+        if title_prefix:
+            seen_prefixes.add(title_prefix)
+        if title_keys:
+            for band, key in zip(simhash_bands, title_keys):
+                band.setdefault(key, []).append(title_sig)
         
-        deduped.append(article)
+        kept.append(index)
     
-    return deduped
+    return kept
 
 
-def is_recent(date_str: str, days: int = 7) -> bool:
-    """Check if date string represents a recent date."""
+def deduplicate_articles(
+    articles: List[Dict[str, Any]],
+    near_duplicate_titles: bool = False,
+    near_duplicate_content: bool = False
+) -> List[Dict[str, Any]]:
+    """Remove duplicate articles based on URL and title similarity, optionally near-duplicate content."""
+    if not articles:
+        return articles
+    
+    kept = dedup_indices(
+        [article.get('url', '') for article in articles],
+        [article.get('title', '') for article in articles],
+        [article.get('summary', '') for article in articles],
+        near_duplicate_titles,
+        near_duplicate_content
+    )
+    return [articles[index] for index in kept]
+
+
+def _parse_date(date_str: str) -> datetime:
+    """Parse a feed date, trying the stdlib ISO 8601 and RFC 2822 parsers before dateutil."""
+    try:
+        return datetime.fromisoformat(date_str)
+    except ValueError:
+        pass
+    
+    try:
+        return parsedate_to_datetime(date_str)
+    except (TypeError, ValueError):
+        return date_parser.parse(date_str)
+
+
+def _recency_cutoffs(days: int) -> Tuple[datetime, datetime]:
+    """Naive local and aware UTC cutoffs for dates newer than the given number of days."""
+    now = datetime.now(timezone.utc)
+    aware_cutoff = now - timedelta(days=days)
+    return aware_cutoff.astimezone().replace(tzinfo=None), aware_cutoff
+
+
+def _is_after(date_str: str, cutoffs: Tuple[datetime, datetime]) -> bool:
+    """Check if a date string parses to a date later than the matching cutoff."""
     if not date_str:
         return False
     
     try:
-        from dateutil import parser as date_parser
-        article_date = date_parser.parse(date_str)
-        cutoff_date = datetime.now() - timedelta(days=days)
-        return article_date > cutoff_date
+        article_date = _parse_date(date_str)
+        # Dates without a timezone are taken as local time, as datetime.now() is
+        return article_date > cutoffs[article_date.tzinfo is not None]
     except:
         return False
 
 
+def is_recent(date_str: str, days: int = 7) -> bool:
+    """Check if date string represents a recent date."""
+    return is_recent_batch([date_str], days)[0]
+
+
+def is_recent_batch(date_strs: List[str], days: int = 7) -> List[bool]:
+    """Check many date strings against one recency cutoff."""
+    cutoffs = _recency_cutoffs(days)
+    return [_is_after(date_str, cutoffs) for date_str in date_strs]
+
+
+def is_recent_filter(articles: List[Dict[str, Any]], days: int = 7) -> List[Dict[str, Any]]:
+    """Keep the articles whose published date is within the given number of days."""
+    cutoffs = _recency_cutoffs(days)
+    return [article for article in articles if _is_after(article.get('published'), cutoffs)]
+
+
 def calculate_reading_time(text: str) -> int:
     """Calculate estimated reading time in minutes."""
     if not text:
@@ -207,33 +478,19 @@ def extract_keywords(text: str, max_keywords: int = 10) -> List[str]:
         return []
     
     # Simple keyword extraction
-    words = re.findall(r'\b[a-zA-Z]{3,}\b', text.lower())
-    
-    # Filter out common stop words
-    stop_words = {
-        'the', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'with',
-        'by', 'from', 'up', 'about', 'into', 'through', 'during', 'before',
-        'after', 'above', 'below', 'between', 'among', 'upon', 'against',
-        'within', 'throughout', 'despite', 'towards', 'concerning',
-        'this', 'that', 'these', 'those', 'they', 'them', 'their', 'there',
-        'where', 'when', 'what', 'who', 'which', 'why', 'how', 'said', 'says',
-        'can', 'could', 'will', 'would', 'should', 'may', 'might', 'must',
-        'have', 'has', 'had', 'having', 'been', 'being', 'was', 'were', 'are',
-        'more', 'most', 'much', 'many', 'some', 'all', 'any', 'each', 'every',
-        'new', 'old', 'first', 'last', 'long', 'great', 'little', 'own', 'other',
-        'right', 'big', 'high', 'different', 'small', 'large', 'next', 'early',
-        'young', 'important', 'few', 'public', 'bad', 'same', 'able'
-    }
-    
-    # Count word frequencies
-    word_freq = {}
-    for word in words:
-        if word not in stop_words and len(word) > 3:
-            word_freq[word] = word_freq.get(word, 0) + 1
-    
-    # Sort by frequency and return top keywords
-    keywords = sorted(word_freq.items(), key=lambda x: x[1], reverse=True)
-    return [word for word, freq in keywords[:max_keywords]]
+    text = text.lower()
+    words = (_ASCII_KEYWORD_RE if text.isascii() else _KEYWORD_RE).findall(text)
+    
+    # Count every word in C, then drop stop words and short words once per distinct word
+    word_freq = Counter(words)
+    for word in [word for word in word_freq if len(word) <= 3 or word in _STOP_WORDS]:
+        del word_freq[word]
+    
+    # Most frequent first (a bounded heap selection), ties in order of first appearance
+    return [word for word, freq in word_freq.most_common(max_keywords)]
+
+
+_SIZE_NAMES = ("B", "KB", "MB", "GB")
 
 
 def format_file_size(size_bytes: int) -> str:
@@ -241,23 +498,20 @@ def format_file_size(size_bytes: int) -> str:
     if size_bytes == 0:
         return "0 B"
     
-    size_names = ["B", "KB", "MB", "GB"]
-    i = 0
-    size_float = float(size_bytes)
-    while size_float >= 1024 and i < len(size_names) - 1:
-        size_float /= 1024.0
-        i += 1
+    # Each unit is 10 more bits; sizes under 1 KB (including negative ones) stay in bytes
+    i = min((size_bytes.bit_length() - 1) // 10, len(_SIZE_NAMES) - 1) if size_bytes >= 1024 else 0
     
-    return f"{size_float:.1f} {size_names[i]}"
+    return f"{size_bytes / (1 << (10 * i)):.1f} {_SIZE_NAMES[i]}"
 
 
+@lru_cache(maxsize=4096)
 def validate_url(url: str) -> bool:
     """Validate if URL is properly formatted."""
     if not url:
         return False
     
     try:
-        result = urlparse(url)
+        result = _cached_urlparse(url)
         return all([result.scheme, result.netloc])
     except:
         return False
@@ -280,14 +534,8 @@ def truncate_text(text: str, max_length: int = 200, suffix: str = "...") -> str:
 
 def sanitize_filename(filename: str) -> str:
     """Sanitize filename for safe file system usage."""
-    # Remove path separators
-    filename = filename.replace('/', '_').replace('\\', '_')
-    
-    # Remove or replace other problematic characters
-    filename = re.sub(r'[<>:"|?*]', '', filename)
-    
-    # Remove control characters
-    filename = ''.join(char for char in filename if ord(char) >= 32)
+    # Replace path separators, drop other problematic and control characters
+    filename = filename.translate(_SANITIZE_TABLE)
     
     # Limit length
     if len(filename) > 255:
@@ -297,15 +545,43 @@ def sanitize_filename(filename: str) -> str:
     return filename.strip()
 
 
+def atomic_write_bytes(path: Path, data: bytes) -> None:
+    """Replace a file so readers only ever see a complete file, even after a crash."""
+    # mkstemp files are private (0600); give the new file the mode a plain open() would have
+    try:
+        mode = stat.S_IMODE(os.stat(path).st_mode)
+    except FileNotFoundError:
+        mode = 0o666 & ~_UMASK
+    
+    # Each writer gets its own temp file, so concurrent writes of one file never interleave
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=path.name, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.chmod(tmp_path, mode)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
 def merge_article_data(base_article: Dict[str, Any], additional_data: Dict[str, Any]) -> Dict[str, Any]:
-    """Merge additional data into base article, preferring non-empty values."""
+    """Merge additional data into base article, preferring non-empty values.
+    
+    With nothing to merge the base article is returned as is; otherwise the result is a copy.
+    """
+    if not additional_data:
+        return base_article
+    
     merged = base_article.copy()
     
     for key, value in additional_data.items():
-        if value and (key not in merged or not merged[key]):
+        if value and not merged.get(key):
             merged[key] = value
         elif key == 'tags' and isinstance(value, list) and isinstance(merged.get(key), list):
-            # Merge tag lists
-            merged[key] = list(set(merged[key] + value))
+            # Merge tag lists, keeping first-seen order
+            merged[key] = list(dict.fromkeys(merged[key] + value))
     
-    return merged
\ No newline at end of file
+    return merged
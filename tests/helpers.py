@@ -0,0 +1,26 @@
+"""Shared fixtures for the test modules."""
+
+import os
+import sys
+from pathlib import Path
+
+# Add the src directory to the path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import orjson
+
+from news_fetcher.config import Config
+
+
+def make_config(root: Path, credentials: dict = None) -> Config:
+    """Create a Config in a temporary data directory."""
+    config_dir = root / "data" / "config"
+    config_dir.mkdir(parents=True)
+    (config_dir / "preferences.json").write_bytes(orjson.dumps({
+        'interests': [], 'sources': [], 'language': 'en', 'max_articles_per_feed': 20,
+        'enable_full_text': True, 'preferred_formats': ['epub'], 'exclude_domains': [],
+        'keywords_boost': [], 'keywords_filter': []
+    }))
+    (config_dir / "sources.json").write_bytes(orjson.dumps({'general': []}))
+    (config_dir / "credentials.json").write_bytes(orjson.dumps(credentials or {}))
+    return Config(str(config_dir))
@@ -0,0 +1,198 @@
+"""Tests for the streaming LLM calls in news_fetcher.llm_client."""
+
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import orjson
+
+from helpers import make_config
+from news_fetcher import llm_client
+from news_fetcher.llm_client import LLMClient
+
+
+class _FakeStream:
+    """Stands in for a streaming requests response, recording how many lines were read."""
+
+    def __init__(self, lines):
+        self.lines = lines
+        self.consumed = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def raise_for_status(self):
+        pass
+
+    def iter_lines(self):
+        for line in self.lines:
+            self.consumed += 1
+            yield line
+
+
+def openai_line(content):
+    return b"data: " + orjson.dumps({"choices": [{"delta": {"content": content}}]})
+
+
+def anthropic_line(event):
+    return b"data: " + orjson.dumps(event)
+
+
+class LLMClientTestCase(unittest.TestCase):
+    """Base case with an LLMClient for a given provider."""
+
+    provider = "openai"
+
+    def setUp(self):
+        self.tmp = Path(tempfile.mkdtemp())
+        config = make_config(self.tmp, credentials={"llm": {
+            "provider": self.provider, "model": "test-model", "api_key": "test-key",
+            "base_url": "https://llm.example/v1/messages"
+        }})
+        self.client = LLMClient(config)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def stream(self, lines):
+        """Patch the shared session so the next POST streams the given lines."""
+        response = _FakeStream(lines)
+        patcher = mock.patch.object(llm_client._SESSION, "post", return_value=response)
+        self.post = patcher.start()
+        self.addCleanup(patcher.stop)
+        return response
+
+
+class TestOpenAIStream(LLMClientTestCase):
+    """Server-sent event handling for the OpenAI chat completions stream."""
+
+    def test_concatenates_content_deltas(self):
+        self.stream([openai_line("Hello"), openai_line(", "), openai_line("world"), b"data: [DONE]"])
+        self.assertEqual(self.client._call_llm("prompt"), "Hello, world")
+
+    def test_request_is_streamed(self):
+        self.stream([b"data: [DONE]"])
+        self.client._call_llm("prompt")
+
+        args, kwargs = self.post.call_args
+        self.assertEqual(args[0], "https://llm.example/v1/messages")
+        self.assertTrue(kwargs["stream"])
+        self.assertEqual(kwargs["headers"]["Authorization"], "Bearer test-key")
+        payload = orjson.loads(kwargs["data"])
+        self.assertTrue(payload["stream"])
+        self.assertEqual(payload["model"], "test-model")
+        self.assertEqual(payload["messages"], [{"role": "user", "content": "prompt"}])
+
+    def test_stops_at_done(self):
+        response = self.stream([openai_line("one"), b"data: [DONE]", openai_line("two")])
+        self.assertEqual(self.client._call_llm("prompt"), "one")
+        self.assertEqual(response.consumed, 2)
+
+    def test_skips_non_data_lines(self):
+        self.stream([
+            b"", b": keep-alive", b"event: message", openai_line("A"),
+            b"data: " + orjson.dumps({"choices": [{"delta": {}}]}),
+            b"data: " + orjson.dumps({"choices": []}),
+            openai_line("B"), b"data: [DONE]"
+        ])
+        self.assertEqual(self.client._call_llm("prompt"), "AB")
+
+    def test_stops_once_the_ranking_array_is_complete(self):
+        response = self.stream([
+            openai_line("Ranking: [3"), openai_line(", 1"), openai_line(", 7]"),
+            openai_line(" because"), openai_line(" reasons"), b"data: [DONE]"
+        ])
+        text = self.client._call_llm("prompt", stop_pattern=llm_client._RANK_JSON_RE)
+        self.assertEqual(text, "Ranking: [3, 1, 7]")
+        self.assertEqual(response.consumed, 3)
+
+    def test_rank_articles_uses_streamed_indices(self):
+        articles = [{"title": f"Story {i}", "summary": "", "source": "", "published": ""} for i in range(8)]
+        self.stream([openai_line("[3, 1, 7]"), openai_line(" trailing"), b"data: [DONE]"])
+        ranked = self.client.rank_articles(articles, "news")
+        self.assertEqual([article["title"] for article in ranked], ["Story 3", "Story 1", "Story 7"])
+
+
+class TestAnthropicStream(LLMClientTestCase):
+    """Server-sent event handling for the Anthropic messages stream."""
+
+    provider = "anthropic"
+
+    def test_only_text_deltas_are_collected(self):
+        self.stream([
+            b"event: message_start",
+            anthropic_line({"type": "message_start", "message": {"id": "msg_1"}}),
+            anthropic_line({"type": "content_block_start", "index": 0, "content_block": {"type": "text", "text": ""}}),
+            anthropic_line({"type": "ping"}),
+            anthropic_line({"type": "content_block_delta", "index": 0, "delta": {"type": "text_delta", "text": "Top "}}),
+            anthropic_line({"type": "content_block_delta", "index": 0, "delta": {"type": "text_delta", "text": "story"}}),
+            anthropic_line({"type": "content_block_stop", "index": 0}),
+            anthropic_line({"type": "message_delta", "delta": {"stop_reason": "end_turn"}}),
+            anthropic_line({"type": "message_stop"}),
+        ])
+        self.assertEqual(self.client._call_llm("prompt"), "Top story")
+
+    def test_request_headers(self):
+        self.stream([])
+        self.client._call_llm("prompt")
+        headers = self.post.call_args.kwargs["headers"]
+        self.assertEqual(headers["x-api-key"], "test-key")
+        self.assertIn("anthropic-version", headers)
+
+    def test_stops_once_the_ranking_array_is_complete(self):
+        response = self.stream([
+            anthropic_line({"type": "content_block_delta", "delta": {"text": "[3, 1"}}),
+            anthropic_line({"type": "content_block_delta", "delta": {"text": ", 7]"}}),
+            anthropic_line({"type": "content_block_delta", "delta": {"text": " and more"}}),
+        ])
+        text = self.client._call_llm("prompt", stop_pattern=llm_client._RANK_JSON_RE)
+        self.assertEqual(text, "[3, 1, 7]")
+        self.assertEqual(response.consumed, 2)
+
+
+class TestRankingParser(unittest.TestCase):
+    """Index extraction from ranking responses."""
+
+    def parse(self, response):
+        return LLMClient._parse_ranking_response(LLMClient.__new__(LLMClient), response)
+
+    def test_json_array(self):
+        self.assertEqual(self.parse("[3, 1, 7, 2, 9]"), [3, 1, 7, 2, 9])
+
+    def test_array_is_preferred_over_other_numbers(self):
+        self.assertEqual(self.parse("Ranked 10 items, best first: [2, 0]"), [2, 0])
+
+    def test_no_brackets(self):
+        self.assertEqual(self.parse("I would pick 3 and then 1"), [3, 1])
+
+    def test_empty_array_falls_back_to_numbers(self):
+        self.assertEqual(self.parse("[] then 4 2"), [4, 2])
+
+    def test_unclosed_array(self):
+        self.assertEqual(self.parse("[2, 4"), [2, 4])
+
+    def test_number_at_end_of_string(self):
+        self.assertEqual(self.parse("The best one is 12"), [12])
+
+    def test_at_most_five_indices(self):
+        self.assertEqual(self.parse("[1, 2, 3, 4, 5, 6, 7]"), [1, 2, 3, 4, 5])
+        self.assertEqual(self.parse("8 6 4 2 0 1 3"), [8, 6, 4, 2, 0])
+
+    def test_no_numbers(self):
+        self.assertIsNone(self.parse("Sorry, I cannot rank these."))
+        self.assertIsNone(self.parse(""))
+
+    def test_scan_indices_range(self):
+        self.assertEqual(LLMClient._scan_indices("a1b22c333", 0, 9), [1, 22, 333])
+        self.assertEqual(LLMClient._scan_indices("12 34 56", 3, 8), [34, 56])
+        self.assertEqual(LLMClient._scan_indices("12 34", 0, 4), [12, 3])
+        self.assertEqual(LLMClient._scan_indices("1 2 3", 0, 5, limit=2), [1, 2])
+
+
+if __name__ == '__main__':
+    unittest.main()
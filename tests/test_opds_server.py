@@ -0,0 +1,114 @@
+"""Tests for the cached OPDS feed responses in news_fetcher.opds_server."""
+
+import gzip
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+from fastapi.testclient import TestClient
+
+from helpers import make_config
+from news_fetcher.opds_server import create_opds_app
+
+
+class OPDSTestCase(unittest.TestCase):
+    """Base case with an OPDS app over a temporary EPUB directory."""
+
+    def setUp(self):
+        self.tmp = Path(tempfile.mkdtemp())
+        self.config = make_config(self.tmp)
+        self.add_epub("daily-news_2024-01-01.epub")
+        self.client = TestClient(create_opds_app(self.config))
+
+    def tearDown(self):
+        self.client.close()
+        shutil.rmtree(self.tmp)
+
+    def add_epub(self, name: str) -> None:
+        (self.config.epubs_dir / name).write_bytes(b"PK\x03\x04 not really an epub")
+
+
+class TestFeedValidators(OPDSTestCase):
+    """ETag, Last-Modified and 304 handling for the catalog feeds."""
+
+    def test_validators_are_sent(self):
+        for path in ("/opds", "/opds/recent"):
+            response = self.client.get(path)
+            self.assertEqual(response.status_code, 200)
+            self.assertTrue(response.headers["ETag"].startswith('W/"'))
+            self.assertIn("Last-Modified", response.headers)
+            self.assertEqual(response.headers["Vary"], "Accept-Encoding")
+
+    def test_no_last_modified_without_epubs(self):
+        (self.config.epubs_dir / "daily-news_2024-01-01.epub").unlink()
+        response = self.client.get("/opds")
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("ETag", response.headers)
+        self.assertNotIn("Last-Modified", response.headers)
+
+    def test_etag_is_stable_while_unchanged(self):
+        first = self.client.get("/opds").headers["ETag"]
+        self.assertEqual(self.client.get("/opds").headers["ETag"], first)
+        self.assertEqual(self.client.get("/catalog.xml").headers["ETag"], first)
+
+    def test_matching_etag_gets_304(self):
+        for path in ("/opds", "/opds/recent"):
+            etag = self.client.get(path).headers["ETag"]
+            response = self.client.get(path, headers={"If-None-Match": etag})
+            self.assertEqual(response.status_code, 304)
+            self.assertEqual(response.content, b"")
+            self.assertEqual(response.headers["ETag"], etag)
+
+    def test_etag_in_list_gets_304(self):
+        etag = self.client.get("/opds").headers["ETag"]
+        response = self.client.get("/opds", headers={"If-None-Match": f'W/"other", {etag}'})
+        self.assertEqual(response.status_code, 304)
+
+    def test_other_etag_gets_feed(self):
+        response = self.client.get("/opds", headers={"If-None-Match": 'W/"0000000000000000"'})
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(b"daily-news_2024-01-01.epub", response.content)
+
+    def test_new_epub_changes_etag(self):
+        etag = self.client.get("/opds").headers["ETag"]
+        self.add_epub("tech-roundup_2024-01-02.epub")
+
+        response = self.client.get("/opds", headers={"If-None-Match": etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response.headers["ETag"], etag)
+        self.assertIn(b"tech-roundup_2024-01-02.epub", response.content)
+
+
+class TestFeedCompression(OPDSTestCase):
+    """Pre-gzipped feed responses."""
+
+    def get_raw(self, path: str, accept_encoding: str):
+        """Fetch a feed without letting the client decode the body."""
+        with self.client.stream("GET", path, headers={"Accept-Encoding": accept_encoding}) as response:
+            return response, b"".join(response.iter_raw())
+
+    def test_gzip_clients_get_compressed_feed(self):
+        for path in ("/opds", "/opds/recent"):
+            plain, plain_body = self.get_raw(path, "identity")
+            compressed, compressed_body = self.get_raw(path, "gzip, deflate")
+
+            self.assertNotIn("Content-Encoding", plain.headers)
+            self.assertEqual(compressed.headers["Content-Encoding"], "gzip")
+            self.assertEqual(gzip.decompress(compressed_body), plain_body)
+            self.assertTrue(plain_body.startswith(b"<?xml"))
+
+    def test_both_encodings_share_the_etag(self):
+        plain, _ = self.get_raw("/opds", "identity")
+        compressed, _ = self.get_raw("/opds", "gzip")
+        self.assertEqual(plain.headers["ETag"], compressed.headers["ETag"])
+
+    def test_content_type(self):
+        response, _ = self.get_raw("/opds/recent", "gzip")
+        self.assertTrue(response.headers["Content-Type"].startswith(
+            "application/atom+xml;profile=opds-catalog;kind=acquisition"
+        ))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,307 @@
+"""Tests for feed fetching and the article cache in news_fetcher.tools."""
+
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import unittest
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from unittest import mock
+
+# Add the repository root to the path, for dev_utils
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import orjson
+
+import dev_utils
+from helpers import make_config
+from news_fetcher import tools
+
+ARTICLE_HTML = (
+    "<html><head><title>Shared Story</title></head><body><article><h1>Shared Story</h1>"
+    + "".join(
+        f"<p>Paragraph {i} of the shared story, long enough for the extractor to keep it as content.</p>"
+        for i in range(12)
+    )
+    + "</article></body></html>"
+).encode('utf-8')
+
+
+class _ArticleHandler(BaseHTTPRequestHandler):
+    """Serves the same article page on every path and counts requests."""
+
+    hits = []
+
+    def do_GET(self):
+        self.hits.append(self.path)
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(ARTICLE_HTML)))
+        self.end_headers()
+        self.wfile.write(ARTICLE_HTML)
+
+    def log_message(self, *args):
+        pass
+
+
+FEED_XML = b"""<?xml version="1.0"?><rss version="2.0"><channel><title>Test Feed</title>
+<item><title>First story</title><link>https://news.example/first</link><description>One</description>
+<pubDate>Mon, 01 Jan 2024 10:00:00 GMT</pubDate></item>
+<item><title>Second story</title><link>https://news.example/second</link><description>Two</description>
+<pubDate>Tue, 02 Jan 2024 10:00:00 GMT</pubDate></item>
+</channel></rss>"""
+
+
+class _FeedHandler(BaseHTTPRequestHandler):
+    """Serves one RSS feed with validators, answering matching revalidations with 304."""
+
+    requests = []
+
+    def do_GET(self):
+        self.requests.append(dict(self.headers))
+        if self.headers.get('If-None-Match') == '"v1"':
+            self.send_response(304)
+            self.send_header('ETag', '"v1"')
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/rss+xml')
+        self.send_header('ETag', '"v1"')
+        self.send_header('Last-Modified', 'Tue, 02 Jan 2024 10:00:00 GMT')
+        self.send_header('Content-Length', str(len(FEED_XML)))
+        self.end_headers()
+        self.wfile.write(FEED_XML)
+
+    def log_message(self, *args):
+        pass
+
+
+class TestFeedRevalidation(unittest.TestCase):
+    """Expired feed cache entries are revalidated with conditional requests."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(('127.0.0.1', 0), _FeedHandler)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.feed_url = f"http://127.0.0.1:{cls.server.server_address[1]}/rss"
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        self.tmp = Path(tempfile.mkdtemp())
+        self.config = make_config(self.tmp)
+        tools._MEM_CACHE.clear()
+        _FeedHandler.requests.clear()
+
+    def tearDown(self):
+        tools._MEM_CACHE.clear()
+        shutil.rmtree(self.tmp)
+
+    def test_not_modified_reuses_cached_articles(self):
+        articles, errors = tools._fetch_feed(self.feed_url, self.config)
+        self.assertEqual(errors, [])
+        self.assertEqual([article['title'] for article in articles], ["First story", "Second story"])
+        self.assertNotIn('If-None-Match', _FeedHandler.requests[0])
+
+        # Expire the cache so the next call has to revalidate
+        self.config.cache_ttl = 0
+        tools._MEM_CACHE.clear()
+        revalidated, errors = tools._fetch_feed(self.feed_url, self.config)
+
+        self.assertEqual(errors, [])
+        self.assertEqual(len(_FeedHandler.requests), 2)
+        self.assertEqual(_FeedHandler.requests[1]['If-None-Match'], '"v1"')
+        self.assertEqual(_FeedHandler.requests[1]['If-Modified-Since'], 'Tue, 02 Jan 2024 10:00:00 GMT')
+        self.assertEqual(revalidated, articles)
+
+    def test_not_modified_refreshes_the_cache_entry(self):
+        tools._fetch_feed(self.feed_url, self.config)
+        cache_path = self.config.get_cache_path(f"feed_{tools._cache_key(self.feed_url)}")
+        first_timestamp = orjson.loads(cache_path.read_bytes())['timestamp']
+
+        self.config.cache_ttl = 0
+        tools._MEM_CACHE.clear()
+        tools._fetch_feed(self.feed_url, self.config)
+
+        entry = orjson.loads(cache_path.read_bytes())
+        self.assertGreater(entry['timestamp'], first_timestamp)
+        self.assertEqual(entry['etag'], '"v1"')
+        self.assertEqual(len(entry['articles']), 2)
+
+        # Within the refreshed TTL the entry is served without a request
+        self.config.cache_ttl = 3600
+        tools._MEM_CACHE.clear()
+        articles, _ = tools._fetch_feed(self.feed_url, self.config)
+        self.assertEqual(len(articles), 2)
+        self.assertEqual(len(_FeedHandler.requests), 2)
+
+
+class TestArticleBodyCache(unittest.TestCase):
+    """Tests for the compressed, content-addressed article body cache."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(('127.0.0.1', 0), _ArticleHandler)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.base_url = f"http://127.0.0.1:{cls.server.server_address[1]}"
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        self.tmp = Path(tempfile.mkdtemp())
+        self.config = make_config(self.tmp)
+        tools._MEM_CACHE.clear()
+        _ArticleHandler.hits.clear()
+
+    def tearDown(self):
+        tools._MEM_CACHE.clear()
+        shutil.rmtree(self.tmp)
+
+    def body_files(self):
+        return sorted(self.config.cache_dir.glob("body_*.z"))
+
+    def test_body_is_stored_compressed(self):
+        article = tools.fetch_article(f"{self.base_url}/one", config=self.config)
+        self.assertTrue(article['success'])
+
+        bodies = self.body_files()
+        self.assertEqual(len(bodies), 1)
+        self.assertEqual(zlib.decompress(bodies[0].read_bytes()).decode('utf-8'), article['text'])
+
+        entries = list(self.config.cache_dir.glob("article_*.json"))
+        self.assertEqual(len(entries), 1)
+        entry = orjson.loads(entries[0].read_bytes())
+        self.assertNotIn('text', entry)
+        self.assertEqual(bodies[0].name, f"body_{entry['content_hash']}.z")
+
+    def test_identical_bodies_are_stored_once(self):
+        first = tools.fetch_article(f"{self.base_url}/one", config=self.config)
+        second = tools.fetch_article(f"{self.base_url}/two", config=self.config)
+        self.assertEqual(first['text'], second['text'])
+        self.assertEqual(len(list(self.config.cache_dir.glob("article_*.json"))), 2)
+        self.assertEqual(len(self.body_files()), 1)
+
+    def test_cached_article_is_read_from_disk(self):
+        url = f"{self.base_url}/one"
+        article = tools.fetch_article(url, config=self.config)
+        tools._MEM_CACHE.clear()
+
+        cached = tools.fetch_article(url, config=self.config)
+        self.assertEqual(cached, article)
+        self.assertEqual(len(_ArticleHandler.hits), 1)
+
+    def test_corrupt_body_is_fetched_again(self):
+        url = f"{self.base_url}/one"
+        article = tools.fetch_article(url, config=self.config)
+        tools._MEM_CACHE.clear()
+        self.body_files()[0].write_bytes(b"not zlib data")
+
+        refetched = tools.fetch_article(url, config=self.config)
+        self.assertTrue(refetched['success'])
+        self.assertEqual(refetched['text'], article['text'])
+        self.assertEqual(len(_ArticleHandler.hits), 2)
+
+        # The body was rewritten, so the next call is served from disk
+        tools._MEM_CACHE.clear()
+        cached = tools.fetch_article(url, config=self.config)
+        self.assertEqual(cached['text'], article['text'])
+        self.assertEqual(len(_ArticleHandler.hits), 2)
+
+    def test_clear_cache_removes_bodies(self):
+        tools.fetch_article(f"{self.base_url}/one", config=self.config)
+        other_file = self.config.cache_dir / "notes.txt"
+        other_file.write_text("keep")
+
+        original_get_config = dev_utils.get_config
+        dev_utils.get_config = lambda: self.config
+        try:
+            dev_utils.clear_cache()
+        finally:
+            dev_utils.get_config = original_get_config
+
+        self.assertEqual(list(self.config.cache_dir.glob("article_*.json")), [])
+        self.assertEqual(self.body_files(), [])
+        self.assertTrue(other_file.exists())
+
+
+class TestSearchFeedsDedup(unittest.TestCase):
+    """search_feeds applies the near-duplicate preferences."""
+
+    TITLE = "Federal Reserve raises interest rates by a quarter point amid inflation worries"
+    SUMMARY = (
+        "The Federal Reserve raised its benchmark interest rate by a quarter of a percentage point "
+        "on Wednesday, citing persistent inflation and a strong labour market, and signalled further increases."
+    )
+
+    def setUp(self):
+        self.tmp = Path(tempfile.mkdtemp())
+        self.config = make_config(self.tmp)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def search(self, articles):
+        with mock.patch.object(tools, '_fetch_feed', return_value=(articles, [])):
+            return tools.search_feeds(sources=["https://feeds.example/rss"], config=self.config)
+
+    def titles(self, result):
+        return sorted(article['title'] for article in result['articles'])
+
+    def test_near_duplicate_titles_preference(self):
+        articles = [
+            {'url': "https://a.com/1", 'title': self.TITLE, 'summary': "", 'published': "2024-01-02"},
+            {'url': "https://b.com/2", 'title': '"' + self.TITLE + '"', 'summary': "", 'published': "2024-01-01"},
+        ]
+        self.assertEqual(len(self.search(articles)['articles']), 2)
+
+        self.config.preferences.near_duplicate_titles = True
+        self.assertEqual(self.titles(self.search(articles)), [self.TITLE])
+
+    def test_near_duplicate_content_preference(self):
+        articles = [
+            {'url': "https://a.com/1", 'title': self.TITLE, 'summary': self.SUMMARY, 'published': "2024-01-02"},
+            {'url': "https://b.com/2", 'title': "Fed hikes rates again", 'summary': self.SUMMARY, 'published': "2024-01-01"},
+        ]
+        self.assertEqual(len(self.search(articles)['articles']), 2)
+
+        self.config.preferences.near_duplicate_content = True
+        self.assertEqual(self.titles(self.search(articles)), [self.TITLE])
+
+
+class TestSearchFeedsLimits(unittest.TestCase):
+    """search_feeds bounds how many feeds it waits on."""
+
+    def setUp(self):
+        self.tmp = Path(tempfile.mkdtemp())
+        self.config = make_config(self.tmp)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def test_feed_count_is_capped(self):
+        urls = [f"https://feeds.example/{i}" for i in range(8)]
+        with mock.patch.object(tools, '_fetch_feed', return_value=([], [])) as fetch_feed:
+            tools.search_feeds(sources=urls, config=self.config)
+        self.assertEqual(sorted(call.args[0] for call in fetch_feed.call_args_list), urls[:5])
+
+        self.config.max_feeds_per_search = 7
+        with mock.patch.object(tools, '_fetch_feed', return_value=([], [])) as fetch_feed:
+            tools.search_feeds(sources=urls, config=self.config)
+        self.assertEqual(fetch_feed.call_count, 7)
+
+    def test_feed_read_timeouts_are_not_retried(self):
+        retries = tools._SESSION.get_adapter("https://feeds.example/rss").max_retries
+        self.assertEqual(retries.read, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
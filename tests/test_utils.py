@@ -0,0 +1,304 @@
+"""Tests for the text, URL and dedup helpers in news_fetcher.utils."""
+
+import os
+import shutil
+import stat
+import sys
+import tempfile
+import unittest
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from unittest import mock
+
+# Add the src directory to the path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from news_fetcher.utils import (
+    atomic_write_bytes,
+    clean_text,
+    dedup_indices,
+    deduplicate_articles,
+    extract_domain,
+    is_recent,
+    is_recent_batch,
+    is_recent_filter,
+    normalize_url,
+    sanitize_filename,
+)
+
+
+class TestCleanText(unittest.TestCase):
+    """Tests for clean_text."""
+
+    def test_empty(self):
+        self.assertEqual(clean_text(""), "")
+        self.assertEqual(clean_text(None), "")
+
+    def test_collapses_whitespace(self):
+        self.assertEqual(clean_text("  Hello \n\t  world  "), "Hello world")
+
+    def test_decodes_html_entities(self):
+        self.assertEqual(clean_text("Fish &amp; Chips &lt;today&gt;"), "Fish & Chips <today>")
+
+    def test_strips_control_characters(self):
+        self.assertEqual(clean_text("Breaking\x00 news\x07"), "Breaking news")
+        self.assertEqual(clean_text("zero\u200bwidth\ufeff"), "zerowidth")
+
+    def test_strips_control_characters_in_non_ascii_text(self):
+        self.assertEqual(clean_text("Café\x00 au lait\x85"), "Café au lait")
+
+    def test_strips_astral_private_use_and_unassigned(self):
+        # Every category C code point goes, not only those in the BMP
+        self.assertEqual(clean_text("a\U000F0001b\U0010FFFDc\U00050000d\U000E0001e"), "abcde")
+
+    def test_keeps_astral_characters_outside_category_c(self):
+        self.assertEqual(clean_text("\U0001F600 \U00020000 \u2764\ufe0f"), "\U0001F600 \U00020000 \u2764\ufe0f")
+        self.assertEqual(clean_text("\U0001F468\u200d\U0001F469"), "\U0001F468\U0001F469")
+
+    def test_keeps_compatibility_characters(self):
+        # No NFKC folding: superscripts, fractions and symbols keep their meaning
+        self.assertEqual(clean_text("10⁶ users"), "10⁶ users")
+        self.assertEqual(clean_text("E=mc²"), "E=mc²")
+        self.assertEqual(clean_text("½ price"), "½ price")
+        self.assertEqual(clean_text("Acme™"), "Acme™")
+
+
+class TestNormalizeUrl(unittest.TestCase):
+    """Tests for normalize_url."""
+
+    def test_empty(self):
+        self.assertEqual(normalize_url(""), "")
+        self.assertEqual(normalize_url("   "), "")
+
+    def test_adds_scheme(self):
+        self.assertEqual(normalize_url("example.com/news"), "https://example.com/news")
+
+    def test_keeps_http(self):
+        self.assertEqual(normalize_url("http://example.com/a"), "http://example.com/a")
+
+    def test_strips_trailing_slash_and_whitespace(self):
+        self.assertEqual(normalize_url("  https://example.com/news/  "), "https://example.com/news")
+
+
+class TestExtractDomain(unittest.TestCase):
+    """Tests for extract_domain."""
+
+    def test_empty(self):
+        self.assertEqual(extract_domain(""), "")
+
+    def test_strips_www_and_lowercases(self):
+        self.assertEqual(extract_domain("https://WWW.Example.COM/path?q=1"), "example.com")
+
+    def test_without_scheme(self):
+        self.assertEqual(extract_domain("news.example.org/story"), "news.example.org")
+
+    def test_keeps_port(self):
+        self.assertEqual(extract_domain("http://localhost:8000/feed"), "localhost:8000")
+
+    def test_ipv6_host(self):
+        self.assertEqual(extract_domain("http://[::1]:8000/feed"), "[::1]:8000")
+
+
+class TestDedupIndices(unittest.TestCase):
+    """Tests for dedup_indices and deduplicate_articles."""
+
+    TITLE = "Federal Reserve raises interest rates by a quarter point amid inflation worries"
+    SUMMARY = (
+        "The Federal Reserve raised its benchmark interest rate by a quarter of a percentage point "
+        "on Wednesday, citing persistent inflation and a strong labour market, and signalled further increases."
+    )
+
+    def test_empty(self):
+        self.assertEqual(dedup_indices([], []), [])
+        self.assertEqual(deduplicate_articles([]), [])
+
+    def test_same_normalized_url(self):
+        urls = ["https://example.com/story/", "example.com/story", "https://example.com/other"]
+        self.assertEqual(dedup_indices(urls, ["One", "Two", "Three"]), [0, 2])
+
+    def test_same_title(self):
+        urls = ["https://a.com/1", "https://b.com/2"]
+        self.assertEqual(dedup_indices(urls, ["Storm hits coast", "  storm HITS   coast "]), [0])
+
+    def test_same_title_prefix(self):
+        urls = ["https://a.com/1", "https://b.com/2"]
+        titles = [self.TITLE, self.TITLE + " - Example News"]
+        self.assertEqual(dedup_indices(urls, titles), [0])
+
+    def test_short_titles_are_not_prefix_matched(self):
+        urls = ["https://a.com/1", "https://b.com/2"]
+        self.assertEqual(dedup_indices(urls, ["Live updates", "Live updates: day 2"]), [0, 1])
+
+    def test_near_duplicate_titles_are_opt_in(self):
+        urls = ["https://a.com/1", "https://b.com/2"]
+        titles = [self.TITLE, '"' + self.TITLE + '"']
+        self.assertEqual(dedup_indices(urls, titles), [0, 1])
+        self.assertEqual(dedup_indices(urls, titles, near_duplicate_titles=True), [0])
+        self.assertEqual(dedup_indices(urls, [self.TITLE, "UPDATE: " + self.TITLE], near_duplicate_titles=True), [0])
+
+    def test_near_duplicate_titles_keep_different_stories(self):
+        urls = ["https://a.com/1", "https://b.com/2", "https://c.com/3"]
+        titles = [self.TITLE, "Storm hits Florida coast as thousands evacuate", "Apple unveils new iPhone"]
+        self.assertEqual(dedup_indices(urls, titles, near_duplicate_titles=True), [0, 1, 2])
+
+    def test_near_duplicate_content_is_opt_in(self):
+        urls = ["https://a.com/1", "https://b.com/2"]
+        titles = [self.TITLE, "Fed hikes rates again"]
+        summaries = [self.SUMMARY, self.SUMMARY]
+        self.assertEqual(dedup_indices(urls, titles, summaries), [0, 1])
+        self.assertEqual(dedup_indices(urls, titles, summaries, near_duplicate_content=True), [0])
+
+    def test_shared_boilerplate_summary_keeps_distinct_stories(self):
+        urls = ["https://a.com/1", "https://a.com/2"]
+        titles = ["Budget passes Senate", "Budget fails in House"]
+        summaries = [self.SUMMARY, self.SUMMARY]
+        self.assertEqual(dedup_indices(urls, titles, summaries), [0, 1])
+
+    def test_deduplicate_articles_keeps_order_and_objects(self):
+        articles = [
+            {'url': "https://a.com/1", 'title': "First", 'summary': ""},
+            {'url': "https://a.com/1/", 'title': "First again", 'summary': ""},
+            {'url': "https://b.com/2", 'title': "Second", 'summary': ""},
+        ]
+        result = deduplicate_articles(articles)
+        self.assertEqual(len(result), 2)
+        self.assertIs(result[0], articles[0])
+        self.assertIs(result[1], articles[2])
+
+
+class TestIsRecent(unittest.TestCase):
+    """Tests for is_recent, is_recent_batch and is_recent_filter."""
+
+    def setUp(self):
+        now = datetime.now(timezone.utc)
+        self.recent_utc = (now - timedelta(days=2)).isoformat()
+        self.old_utc = (now - timedelta(days=10)).isoformat()
+        self.recent_naive = (datetime.now() - timedelta(days=2)).isoformat()
+        self.old_naive = (datetime.now() - timedelta(days=10)).isoformat()
+        self.recent_rfc2822 = (now - timedelta(days=1)).strftime('%a, %d %b %Y %H:%M:%S GMT')
+
+    def test_timezone_aware_dates(self):
+        self.assertTrue(is_recent(self.recent_utc))
+        self.assertFalse(is_recent(self.old_utc))
+
+    def test_other_offsets(self):
+        recent = (datetime.now(timezone(timedelta(hours=-5))) - timedelta(days=6, hours=23)).isoformat()
+        self.assertTrue(is_recent(recent))
+
+    def test_naive_dates_are_local_time(self):
+        self.assertTrue(is_recent(self.recent_naive))
+        self.assertFalse(is_recent(self.old_naive))
+
+    def test_rfc2822_dates(self):
+        self.assertTrue(is_recent(self.recent_rfc2822))
+
+    def test_days_argument(self):
+        self.assertFalse(is_recent(self.recent_utc, days=1))
+        self.assertTrue(is_recent(self.old_utc, days=30))
+
+    def test_missing_or_invalid(self):
+        self.assertFalse(is_recent(""))
+        self.assertFalse(is_recent(None))
+        self.assertFalse(is_recent("not a date"))
+
+    def test_batch(self):
+        dates = [self.recent_utc, self.old_utc, self.recent_naive, "", "garbage", self.recent_rfc2822]
+        self.assertEqual(is_recent_batch(dates), [True, False, True, False, False, True])
+        self.assertEqual(is_recent_batch([]), [])
+
+    def test_filter(self):
+        articles = [
+            {'title': 'recent', 'published': self.recent_utc},
+            {'title': 'old', 'published': self.old_utc},
+            {'title': 'undated'},
+            {'title': 'empty', 'published': None},
+            {'title': 'local', 'published': self.recent_naive},
+        ]
+        kept = is_recent_filter(articles)
+        self.assertEqual([article['title'] for article in kept], ['recent', 'local'])
+        self.assertIs(kept[0], articles[0])
+        self.assertEqual(is_recent_filter(articles, days=30), [articles[0], articles[1], articles[4]])
+
+
+class TestSanitizeFilename(unittest.TestCase):
+    """Tests for sanitize_filename."""
+
+    def test_replaces_path_separators(self):
+        self.assertEqual(sanitize_filename("a/b\\c.epub"), "a_b_c.epub")
+
+    def test_drops_reserved_characters(self):
+        self.assertEqual(sanitize_filename('what<>:"|?*.epub'), "what.epub")
+
+    def test_drops_c0_controls(self):
+        self.assertEqual(sanitize_filename("news\x00\x1f\t\nday.epub"), "newsday.epub")
+
+    def test_keeps_emoji_zwj_sequences(self):
+        family = "\U0001F468\u200d\U0001F469\u200d\U0001F467 family.epub"
+        self.assertEqual(sanitize_filename(family), family)
+
+    def test_keeps_non_ascii(self):
+        self.assertEqual(sanitize_filename("Café ½ Straße.epub"), "Café ½ Straße.epub")
+
+    def test_strips_surrounding_whitespace(self):
+        self.assertEqual(sanitize_filename("  report.epub  "), "report.epub")
+
+    def test_limits_length_keeping_extension(self):
+        result = sanitize_filename("x" * 300 + ".epub")
+        self.assertTrue(result.endswith(".epub"))
+        self.assertLessEqual(len(result), 255)
+        self.assertEqual(len(sanitize_filename("y" * 300)), 250)
+
+
+
+class TestAtomicWriteBytes(unittest.TestCase):
+    """Tests for atomic_write_bytes."""
+
+    def setUp(self):
+        self.tmp = Path(tempfile.mkdtemp())
+        self.path = self.tmp / "entry.json"
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def mode(self):
+        return stat.S_IMODE(os.stat(self.path).st_mode)
+
+    def test_writes_data_without_leftovers(self):
+        atomic_write_bytes(self.path, b"first")
+        atomic_write_bytes(self.path, b"second")
+        self.assertEqual(self.path.read_bytes(), b"second")
+        self.assertEqual(os.listdir(self.tmp), ["entry.json"])
+
+    def test_new_file_gets_umask_mode(self):
+        umask = os.umask(0o027)
+        try:
+            atomic_write_bytes(self.path, b"data")
+        finally:
+            os.umask(umask)
+        self.assertEqual(self.mode(), 0o666 & ~umask)
+
+    def test_existing_mode_is_kept(self):
+        self.path.write_bytes(b"old")
+        os.chmod(self.path, 0o640)
+        atomic_write_bytes(self.path, b"new")
+        self.assertEqual(self.mode(), 0o640)
+        self.assertEqual(self.path.read_bytes(), b"new")
+
+    def test_data_is_synced_before_replace(self):
+        calls = []
+        with mock.patch("os.fsync", side_effect=lambda fd: calls.append("fsync")), \
+                mock.patch("os.replace", side_effect=lambda src, dst: calls.append("replace")):
+            atomic_write_bytes(self.path, b"data")
+        self.assertEqual(calls, ["fsync", "replace"])
+
+    def test_failed_write_leaves_no_temp_file(self):
+        self.path.write_bytes(b"old")
+        with mock.patch("os.replace", side_effect=OSError("disk full")):
+            with self.assertRaises(OSError):
+                atomic_write_bytes(self.path, b"new")
+        self.assertEqual(self.path.read_bytes(), b"old")
+        self.assertEqual(os.listdir(self.tmp), ["entry.json"])
+
+
+if __name__ == '__main__':
+    unittest.main()